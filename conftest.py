@@ -0,0 +1 @@
+# 讓 pytest 從專案根目錄匯入 ty_address_finder
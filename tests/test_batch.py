@@ -0,0 +1,102 @@
+from ty_address_finder import circuit_breaker
+from ty_address_finder.batch import lookup_address, process_rows, APPROXIMATE_NOTE
+from ty_address_finder.circuit_breaker import new_breaker, breaker_record, guarded
+from ty_address_finder.query_cache import load_query_cache, search_with_variants
+
+
+def new_cache(tmp_path):
+    return load_query_cache(str(tmp_path / 'query_cache.json'))
+
+
+def test_lookup_marks_extra_candidates_in_full_address(tmp_path):
+    site = lambda query: ['桃園區中正里1鄰中正路1號', '桃園區中山里2鄰中正路1號']
+    full_address, _ = lookup_address(1, '桃園區中正路1號', site, new_cache(tmp_path))
+    assert full_address == '桃園市桃園區中正里1鄰中正路1號(另有候選：桃園區中山里2鄰中正路1號)'
+
+
+def test_lookup_single_candidate_has_no_note(tmp_path):
+    site = lambda query: ['桃園區中正里1鄰中正路1號']
+    full_address, simplified = lookup_address(1, '桃園區中正路1號', site, new_cache(tmp_path))
+    assert full_address == '桃園市桃園區中正里1鄰中正路1號'
+    assert '里' in simplified
+
+
+def test_lookup_marks_approximate_result(tmp_path):
+    site = lambda query: ['桃園區中正里5鄰中正路15號'] if query == '桃園區中正路15號' else []
+    full_address, _ = lookup_address(1, '桃園區中正路15之3號', site, new_cache(tmp_path))
+    assert full_address == f'桃園市桃園區中正里5鄰中正路15之3號{APPROXIMATE_NOTE}'
+
+
+def flaky_site(down_for):
+    """ 前 down_for 次查詢逾時，之後恢復正常 """
+    calls = []
+
+    def search(query):
+        calls.append(query)
+        if len(calls) <= down_for:
+            raise TimeoutError(query)
+        return [query.replace('桃園區', '桃園區中正里1鄰')]
+    return search
+
+
+def run_rows(addresses, search_fn, breaker, tmp_path, **kwargs):
+    written = {}
+    process_rows(list(enumerate(addresses, start=1)), search_fn, new_cache(tmp_path), breaker,
+                 lambda i, full_address, simplified: written.setdefault(i, full_address), **kwargs)
+    return written
+
+
+ADDRESSES = [f'桃園區中正路{n}號' for n in range(1, 7)]
+
+
+def test_rows_failing_before_breaker_opens_are_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, 'probe_site', lambda timeout: (True, 0.1))
+    breaker = new_breaker(failure_threshold=3, cooldown=0)
+
+    written = run_rows(ADDRESSES, guarded(breaker, flaky_site(3)), breaker, tmp_path)
+    assert written == {n: f'桃園市桃園區中正里1鄰中正路{n}號' for n in range(1, 7)}
+
+
+def test_isolated_failure_is_written_as_failed(tmp_path):
+    breaker = new_breaker(failure_threshold=3)
+
+    written = run_rows(ADDRESSES, guarded(breaker, flaky_site(1)), breaker, tmp_path)
+    assert written[1] == '查詢失敗'
+    assert all(written[n] == f'桃園市桃園區中正里1鄰中正路{n}號' for n in range(2, 7))
+
+
+def test_outage_that_never_recovers_marks_deferred_rows_failed(tmp_path, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, 'probe_site', lambda timeout: (False, 0.1))
+    breaker = new_breaker(failure_threshold=2, cooldown=0)
+
+    written = run_rows(ADDRESSES, guarded(breaker, flaky_site(10 ** 6)), breaker, tmp_path, max_outage_wait=0)
+    assert written == {n: '查詢失敗' for n in range(1, 7)}
+
+
+def test_cached_rows_complete_while_breaker_is_open(tmp_path, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, 'probe_site', lambda timeout: (False, 0.1))
+    breaker = new_breaker(failure_threshold=1, cooldown=3600)
+    breaker_record(breaker, False)
+    cache = new_cache(tmp_path)
+    search_with_variants(lambda q: ['桃園區中正里1鄰中正路1號'], '桃園區中正路1號', cache)
+
+    written = {}
+    process_rows([(1, '桃園區中正路1號'), (2, '桃園區中正路2號')], guarded(breaker, flaky_site(0)), cache,
+                 breaker, lambda i, full_address, simplified: written.setdefault(i, full_address),
+                 max_outage_wait=0)
+    assert written == {1: '桃園市桃園區中正里1鄰中正路1號', 2: '查詢失敗'}
+
+
+def test_unresolved_rows_can_be_left_for_a_rerun(tmp_path, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, 'probe_site', lambda timeout: (False, 0.1))
+    breaker = new_breaker(failure_threshold=2, cooldown=0)
+    waits = []
+    written = {}
+
+    unresolved = process_rows(list(enumerate(ADDRESSES, start=1)), guarded(breaker, flaky_site(10 ** 6)),
+                              new_cache(tmp_path), breaker,
+                              lambda i, full_address, simplified: written.setdefault(i, full_address),
+                              max_outage_wait=0.3, on_wait=lambda: waits.append(1), fail_unresolved=False)
+    assert written == {}
+    assert sorted(unresolved) == list(enumerate(ADDRESSES, start=1))
+    assert waits  # 等待網站恢復期間有呼叫（分片查詢用來更新心跳）
@@ -0,0 +1,59 @@
+import pytest
+
+from ty_address_finder import circuit_breaker
+from ty_address_finder.circuit_breaker import (SiteUnavailable, new_breaker, breaker_record, breaker_is_open,
+                                               breaker_probe_due, breaker_probe, guarded)
+
+
+def test_opens_after_consecutive_failures():
+    breaker = new_breaker(failure_threshold=3)
+    breaker_record(breaker, False, now=100)
+    breaker_record(breaker, False, now=100)
+    assert not breaker_is_open(breaker)
+    breaker_record(breaker, False, now=100)
+    assert breaker_is_open(breaker)
+    assert not breaker_probe_due(breaker, now=100 + breaker['cooldown'] - 1)
+    assert breaker_probe_due(breaker, now=100 + breaker['cooldown'])
+
+
+def test_success_resets_and_slow_counts_as_failure():
+    breaker = new_breaker(failure_threshold=2, slow_threshold=20)
+    breaker_record(breaker, False)
+    breaker_record(breaker, True, elapsed=1)
+    assert breaker['failures'] == 0
+    breaker_record(breaker, True, elapsed=25)
+    breaker_record(breaker, True, elapsed=25)
+    assert breaker_is_open(breaker)
+
+
+def test_guarded_records_and_stops_when_open():
+    breaker = new_breaker(failure_threshold=2)
+    calls = []
+
+    def failing(query):
+        calls.append(query)
+        raise TimeoutError(query)
+
+    search = guarded(breaker, failing)
+    with pytest.raises(TimeoutError):
+        search('a')
+    with pytest.raises(SiteUnavailable):
+        search('b')  # 第二次失敗即開啟
+    with pytest.raises(SiteUnavailable):
+        search('c')  # 開啟中不再送出
+    assert calls == ['a', 'b']
+
+
+def test_probe_closes_or_backs_off(monkeypatch):
+    breaker = new_breaker(failure_threshold=1, cooldown=60, max_cooldown=100)
+    breaker_record(breaker, False, now=0)
+
+    monkeypatch.setattr(circuit_breaker, 'probe_site', lambda timeout: (False, 0.1))
+    assert not breaker_probe(breaker, now=60)
+    assert breaker['cooldown'] == 100  # 加倍但不超過上限
+    assert breaker['opened_at'] == 60
+
+    monkeypatch.setattr(circuit_breaker, 'probe_site', lambda timeout: (True, 0.1))
+    assert breaker_probe(breaker, now=160)
+    assert not breaker_is_open(breaker)
+    assert breaker['cooldown'] == 60
@@ -0,0 +1,83 @@
+from ty_address_finder.jurisdiction import (parse_house_number, parse_address_parts,
+                                            build_jurisdiction_index, resolve_jurisdiction)
+
+
+def rule(zone, district='桃園區', li='', street='', start=None, end=None, parity=''):
+    return {'zone': zone, 'district': district, 'li': li, 'street': street,
+            'start': parse_house_number(start), 'end': parse_house_number(end), 'parity': parity}
+
+
+RULES = [
+    rule('A', street='中正路', start=1, end=199),
+    rule('B', street='中正路', start=200, end=399, parity='單'),
+    rule('C', street='中正路', start=200, end=399, parity='雙'),
+    rule('D', street='中正路', start='15之3', end='15之9'),
+    rule('E', street='民生路'),
+    rule('F', district='', street='復興路'),
+    rule('L', li='中正里'),
+]
+
+
+def test_parse_house_number():
+    assert parse_house_number('15之3') == (15, 3)
+    assert parse_house_number('15-3') == (15, 3)
+    assert parse_house_number('15號') == (15, 0)
+    assert parse_house_number(15.0) == (15, 0)
+    assert parse_house_number(15.5) is None
+    assert parse_house_number('十五') is None
+    assert parse_house_number(None) is None
+
+
+def test_parse_address_parts():
+    assert parse_address_parts('桃園市桃園區中正里5鄰中正路二段15之3號') == \
+        ('桃園區', '中正里', '中正路二段', (15, 3))
+    assert parse_address_parts('平鎮區中正路1號')[0] == '平鎮區'
+
+
+def test_build_index_sorts_ranges_with_prefix_max_end():
+    index = build_jurisdiction_index(RULES)
+    starts, ranges, prefix_max_end = index['street'][('桃園區', '中正路')]
+    assert starts == sorted(starts)
+    assert prefix_max_end == [max(r[1] for r in ranges[:k + 1]) for k in range(len(ranges))]
+    assert index['li'] == {('桃園區', '中正里'): 'L'}
+
+
+def test_resolve_by_range_and_parity():
+    index = build_jurisdiction_index(RULES)
+    assert resolve_jurisdiction(index, '桃園市桃園區中正里5鄰中正路100號') == 'A'
+    assert resolve_jurisdiction(index, '桃園區中正路201號') == 'B'
+    assert resolve_jurisdiction(index, '桃園區中正路202號') == 'C'
+
+
+def test_resolve_zhi_number_inside_wider_range():
+    index = build_jurisdiction_index(RULES)
+    # 15之5 同時落在 A(1~199) 與 D(15之3~15之9)，先找到較晚開始的區間
+    assert resolve_jurisdiction(index, '桃園區中正路15之5號') == 'D'
+    assert resolve_jurisdiction(index, '桃園區中正路15號') == 'A'
+
+
+def test_resolve_open_ended_and_district_fallback():
+    index = build_jurisdiction_index(RULES)
+    assert resolve_jurisdiction(index, '桃園區民生路9999號') == 'E'
+    assert resolve_jurisdiction(index, '八德區復興路3號') == 'F'
+
+
+def test_resolve_lane_falls_back_to_parent_road():
+    index = build_jurisdiction_index(RULES)
+    # 巷弄沒有規則時，以巷號比對上層路街
+    assert resolve_jurisdiction(index, '桃園區中正路100巷5弄3號') == 'A'
+
+
+def test_resolve_falls_back_to_li():
+    index = build_jurisdiction_index(RULES)
+    assert resolve_jurisdiction(index, '桃園區中正里3鄰中正路500號') == 'L'
+    assert resolve_jurisdiction(index, '桃園區大興路1號') == ''
+    assert resolve_jurisdiction({}, '桃園區中正路1號') == ''
+
+
+def test_rule_names_are_normalized_like_results():
+    index = build_jurisdiction_index([rule('N', street='復興路2段', start='1', end='99'),
+                                      rule('M', li='中山　里', street='')])
+    assert resolve_jurisdiction(index, '桃園市桃園區中正里5鄰復興路二段15號') == 'N'
+    assert resolve_jurisdiction(index, '桃園區復興路２段１５號') == 'N'
+    assert resolve_jurisdiction(index, '桃園區中山里1鄰大興路1號') == 'M'
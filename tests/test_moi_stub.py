@@ -0,0 +1,77 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+from urllib.parse import quote
+
+import pytest
+
+from ty_address_finder.moi_stub import record_search, load_recording, serve
+
+
+def fake_driver(dom):
+    return SimpleNamespace(execute_script=lambda script: dom)
+
+
+@pytest.fixture
+def stub(tmp_path):
+    """ 錄兩筆查詢，提供啟動重播伺服器的函式；測試結束自動關閉 """
+    path = str(tmp_path / 'moi_recording.jsonl')
+    record_search(fake_driver({}), '桃園區中正路1號', '桃園區中正里1鄰中正路1號', 0.5,
+                  ['桃園區中正里1鄰中正路1號', '桃園區中正里2鄰中正路1號'], record_path=path)
+    record_search(fake_driver({'ext-gen111': '<div id="ext-gen111">grid</div>'}),
+                  '桃園區中正路2號', '桃園區中正里1鄰中正路2號', 0.5, record_path=path)
+    servers = []
+
+    def start(**kwargs):
+        server = serve(load_recording(path), port=0, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_address[1]}'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def get(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.status, response.read().decode('utf-8')
+
+
+def test_load_recording_keeps_last_entry_and_skips_bad_lines(tmp_path):
+    path = tmp_path / 'moi_recording.jsonl'
+    path.write_text('\n'.join([
+        json.dumps({'query': 'a', 'result': '1'}),
+        '{"query": "b", "res',
+        json.dumps({'query': 'a', 'result': '2'}),
+    ]), encoding='utf-8')
+    assert {q: e['result'] for q, e in load_recording(str(path)).items()} == {'a': '2'}
+    assert load_recording(str(tmp_path / 'missing.jsonl')) == {}
+
+
+def test_replay_serves_page_and_recorded_results(stub):
+    base = stub()
+
+    status, page = get(f'{base}/address/index.cfm?city_id=68000')
+    assert status == 200
+    for element_id in ('FreeText_ADDR', 'ext-gen51', 'ext-gen111'):
+        assert element_id in page
+
+    _, body = get(f"{base}/query?addr={quote('桃園區中正路1號')}")
+    assert json.loads(body) == {'rows': ['桃園區中正里1鄰中正路1號', '桃園區中正里2鄰中正路1號']}
+
+    _, body = get(f"{base}/query?addr={quote('桃園區中正路2號')}")
+    assert json.loads(body) == {'grid_html': '<div id="ext-gen111">grid</div>'}
+
+    _, body = get(f"{base}/query?addr={quote('桃園區大興路1號')}")
+    assert json.loads(body) == {'rows': []}
+
+
+def test_replay_failure_rate_returns_503(stub):
+    base = stub(failure_rate=1.0, seed=1)
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        get(f"{base}/query?addr={quote('桃園區中正路1號')}")
+    assert excinfo.value.code == 503
@@ -0,0 +1,133 @@
+import time
+
+from ty_address_finder.query_cache import (NO_RESULT, MISS_TTL, load_query_cache, save_query_cache,
+                                           cache_lookup, cache_store, query_variants, search_with_variants)
+
+
+class FakeSite:
+    """ 只認得 answers 裡的查詢字串（單筆字串或候選 list），其餘回傳 []，並記下查過哪些 """
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.queries = []
+
+    def __call__(self, query):
+        self.queries.append(query)
+        answer = self.answers.get(query, [])
+        return [answer] if isinstance(answer, str) else answer
+
+
+def new_cache(tmp_path):
+    return load_query_cache(str(tmp_path / 'query_cache.json'))
+
+
+def test_exact_hit_is_cached(tmp_path):
+    cache = new_cache(tmp_path)
+    site = FakeSite({'桃園區中正路1號': '桃園區中正里1鄰中正路1號'})
+
+    assert search_with_variants(site, '桃園區中正路1號', cache) == ('桃園區中正里1鄰中正路1號', False, False, ['桃園區中正里1鄰中正路1號'])
+    assert search_with_variants(site, '桃園區中正路1號', cache) == ('桃園區中正里1鄰中正路1號', True, False, ['桃園區中正里1鄰中正路1號'])
+    assert site.queries == ['桃園區中正路1號']
+
+
+def test_variant_keeping_house_number_is_exact(tmp_path):
+    cache = new_cache(tmp_path)
+    site = FakeSite({'桃園區中正路2段1號': '桃園區中正里1鄰中正路二段1號'})
+
+    result, from_cache, approximate, _ = search_with_variants(site, '桃園市桃園區中正路二段1號', cache)
+    assert result == '桃園區中正里1鄰中正路二段1號'
+    assert not from_cache and not approximate
+
+
+def test_variant_changing_house_number_is_approximate(tmp_path):
+    cache = new_cache(tmp_path)
+    site = FakeSite({'桃園區中正路15號': '桃園區中正里5鄰中正路15號'})
+
+    result, _, approximate, _ = search_with_variants(site, '桃園區中正路15之3號', cache)
+    assert result == '桃園區中正里5鄰中正路15之3號'
+    assert approximate
+    assert search_with_variants(site, '桃園區中正路15之3號', cache) == (result, True, True, [result])
+
+
+def test_approximate_result_without_ling_is_no_result(tmp_path):
+    cache = new_cache(tmp_path)
+    site = FakeSite({'桃園區中正路15號': '桃園區中正路15號'})
+
+    assert search_with_variants(site, '桃園區中正路15之3號', cache) == (NO_RESULT, False, False, [])
+
+
+def test_negative_result_expires(tmp_path):
+    cache = new_cache(tmp_path)
+    now = time.time()
+    cache_store(cache, '桃園區中正路1號', NO_RESULT, now=now)
+
+    assert cache_lookup(cache, '桃園區中正路1號', now=now + MISS_TTL - 1) == NO_RESULT
+    assert cache_lookup(cache, '桃園區中正路1號', now=now + MISS_TTL + 1) is None
+
+
+def test_preferred_variant_is_tried_first(tmp_path):
+    cache = new_cache(tmp_path)
+    site = FakeSite({'桃園區中正路15號': '桃園區中正里5鄰中正路15號'})
+    search_with_variants(site, '桃園區中正路15之3號', cache)
+
+    # 快取過期後重查：上次成功的寫法第一個送出
+    cache['entries']['桃園區中正路15之3號']['time'] = 0
+    site.queries.clear()
+    search_with_variants(site, '桃園區中正路15之3號', cache)
+    assert site.queries == ['桃園區中正路15號']
+
+
+def test_query_variants_are_unique_and_stacked():
+    variants = query_variants('桃園市桃園區中正路二段100巷5弄3之1號')
+    queries = [q for _, q in variants]
+    assert len(queries) == len(set(queries))
+    assert queries[-1] == '桃園區中正路2段100巷3號'
+
+
+def test_save_and_reload(tmp_path):
+    path = str(tmp_path / 'query_cache.json')
+    cache = load_query_cache(path)
+    cache_store(cache, '桃園區中正路1號', '桃園區中正里1鄰中正路1號')
+    save_query_cache(cache, path)
+
+    assert cache_lookup(load_query_cache(path), '桃園區中正路1號') == '桃園區中正里1鄰中正路1號'
+    assert [p.name for p in tmp_path.iterdir()] == ['query_cache.json']
+
+
+def test_exact_variants_run_before_house_changing_ones(tmp_path):
+    cache = new_cache(tmp_path)
+    cache['variant_stats']['drop_zhi'] = 5
+    site = FakeSite({
+        '桃園區中正路2段15之3號': '桃園區中正里5鄰中正路二段15之3號',
+        '桃園區中正路2段15號': '桃園區中正里6鄰中正路二段15號',
+    })
+
+    result, _, approximate, _ = search_with_variants(site, '桃園市桃園區中正路二段15之3號', cache)
+    assert result == '桃園區中正里5鄰中正路二段15之3號'
+    assert not approximate
+    assert '桃園區中正路2段15號' not in site.queries
+
+
+def test_all_candidates_are_kept_through_the_cache(tmp_path):
+    cache = new_cache(tmp_path)
+    site = FakeSite({'桃園區中正路1號': ['桃園區中正里1鄰中正路1號', '桃園區中山里2鄰中正路1號']})
+
+    first = search_with_variants(site, '桃園區中正路1號', cache)
+    assert first == ('桃園區中正里1鄰中正路1號', False, False,
+                     ['桃園區中正里1鄰中正路1號', '桃園區中山里2鄰中正路1號'])
+    assert search_with_variants(site, '桃園區中正路1號', cache)[3] == first[3]
+
+    # 重新載入存檔後仍保留
+    path = str(tmp_path / 'query_cache.json')
+    save_query_cache(cache, path)
+    assert search_with_variants(site, '桃園區中正路1號', load_query_cache(path))[1:] == (True, False, first[3])
+
+
+def test_approximate_candidates_are_rebuilt_and_merged(tmp_path):
+    cache = new_cache(tmp_path)
+    site = FakeSite({'桃園區中正路15號': ['桃園區中正里5鄰中正路15號', '桃園區中正里5鄰中正路15號',
+                                        '桃園區中山里6鄰中正路15號']})
+
+    _, _, approximate, candidates = search_with_variants(site, '桃園區中正路15之3號', cache)
+    assert approximate
+    assert candidates == ['桃園區中正里5鄰中正路15之3號', '桃園區中山里6鄰中正路15之3號']
@@ -0,0 +1,106 @@
+import os
+import json
+
+import pytest
+
+from ty_address_finder.shard import (QUEUE_DIR, CLAIMED_DIR, DONE_DIR, JOURNAL_DIR, shard_of,
+                                     claim_shard, reclaim_stale, read_journal)
+
+
+def make_work_dir(tmp_path, shard_count=2):
+    tmp_path.mkdir(exist_ok=True)
+    for name in (QUEUE_DIR, CLAIMED_DIR, DONE_DIR, JOURNAL_DIR):
+        (tmp_path / name).mkdir()
+    for k in range(shard_count):
+        (tmp_path / QUEUE_DIR / f'shard_{k:04d}.json').write_text(
+            json.dumps({'shard': k, 'rows': [[k + 1, f'桃園區中正路{k + 1}號']]}), encoding='utf-8')
+    return str(tmp_path)
+
+
+def test_shard_of_ignores_spelling_differences():
+    assert shard_of('桃園區中正路２段１號', 16) == shard_of('桃園區中正路二段1號', 16)
+
+
+def test_claim_shard_takes_each_shard_once(tmp_path):
+    work_dir = make_work_dir(tmp_path)
+    first = claim_shard(work_dir, 'pc1')
+    second = claim_shard(work_dir, 'pc2')
+
+    assert os.path.basename(first) == 'shard_0000@pc1.json'
+    assert os.path.basename(second) == 'shard_0001@pc2.json'
+    assert claim_shard(work_dir, 'pc3') is None
+
+
+def test_claim_shard_resumes_own_shard_first(tmp_path):
+    work_dir = make_work_dir(tmp_path)
+    first = claim_shard(work_dir, 'pc1')
+    assert claim_shard(work_dir, 'pc1') == first
+    assert os.listdir(os.path.join(work_dir, QUEUE_DIR)) == ['shard_0001.json']
+
+
+def test_reclaim_stale_returns_only_silent_shards(tmp_path):
+    work_dir = make_work_dir(tmp_path)
+    stale = claim_shard(work_dir, 'pc1')
+    claim_shard(work_dir, 'pc2')
+    os.utime(stale, (0, 0))
+
+    assert reclaim_stale(work_dir, stale_after=60) == ['shard_0000']
+    assert os.listdir(os.path.join(work_dir, QUEUE_DIR)) == ['shard_0000.json']
+    assert os.listdir(os.path.join(work_dir, CLAIMED_DIR)) == ['shard_0001@pc2.json']
+    # 放回佇列後，任何節點都能接手
+    assert os.path.basename(claim_shard(work_dir, 'pc3')) == 'shard_0000@pc3.json'
+
+
+def test_read_journal_skips_partial_line_and_keeps_last_entry(tmp_path):
+    path = tmp_path / 'shard_0000.jsonl'
+    lines = [
+        {'row': 1, 'full_address': '查詢失敗', 'simplified': ''},
+        {'row': 2, 'full_address': '桃園市桃園區中正里1鄰中正路2號', 'simplified': '桃園區中正里中正路2號'},
+        {'row': 1, 'full_address': '桃園市桃園區中正里1鄰中正路1號', 'simplified': '桃園區中正里中正路1號'},
+    ]
+    text = ''.join(json.dumps(line, ensure_ascii=False) + '\n' for line in lines)
+    path.write_text(text + '{"row": 3, "full_ad', encoding='utf-8')
+
+    assert read_journal(str(path)) == {
+        1: ('桃園市桃園區中正里1鄰中正路1號', '桃園區中正里中正路1號'),
+        2: ('桃園市桃園區中正里1鄰中正路2號', '桃園區中正里中正路2號'),
+    }
+    assert read_journal(str(tmp_path / 'missing.jsonl')) == {}
+
+
+def test_merge_results_writes_rows_by_original_row_number(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    from ty_address_finder.shard import merge_results, addresses_digest, MANIFEST
+
+    addresses = ['桃園區中正路1號', '桃園區中正路2號', '桃園區中正路3號']
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['流水號', '查詢地址', '完整地址', '不含鄰地址'])
+    for address in addresses:
+        ws.append([None, address])
+    source = str(tmp_path / 'address_data.xlsx')
+    wb.save(source)
+
+    work_dir = make_work_dir(tmp_path / 'work', shard_count=0)
+    (tmp_path / 'work' / MANIFEST).write_text(json.dumps({
+        'source': source, 'rows': 3, 'shard_count': 2, 'digest': addresses_digest(addresses)}), encoding='utf-8')
+    # 兩個分片完成順序與列號無關
+    for name, rows in (('shard_0001', [3, 1]), ('shard_0000', [2])):
+        with open(os.path.join(work_dir, JOURNAL_DIR, f'{name}.jsonl'), 'w', encoding='utf-8') as f:
+            for i in rows:
+                f.write(json.dumps({'row': i, 'full_address': f'桃園市桃園區中正里1鄰中正路{i}號',
+                                    'simplified': f'桃園區中正里中正路{i}號'}, ensure_ascii=False) + '\n')
+
+    assert merge_results(work_dir, jurisdiction_path=str(tmp_path / 'missing.xlsx')) == 3
+    ws = openpyxl.load_workbook(source).active
+    assert [ws.cell(row=i + 1, column=3).value for i in (1, 2, 3)] == \
+        [f'桃園市桃園區中正里1鄰中正路{i}號' for i in (1, 2, 3)]
+    assert [ws.cell(row=i + 1, column=1).value for i in (1, 2, 3)] == [1, 2, 3]
+
+
+def test_merge_results_refuses_while_shards_are_unfinished(tmp_path):
+    from ty_address_finder.shard import merge_results, MANIFEST
+
+    work_dir = make_work_dir(tmp_path)
+    (tmp_path / MANIFEST).write_text(json.dumps({'source': 'x.xlsx', 'rows': 2, 'digest': ''}), encoding='utf-8')
+    assert merge_results(work_dir) == 0
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+from ty_address_finder import tab_pool, moi_stub
+from ty_address_finder.tab_pool import search_addresses_in_tabs
+from ty_address_finder.batch import prefetch_in_tabs
+from ty_address_finder.query_cache import load_query_cache
+
+
+def fake_tab_driver(answers, handles=('t0', 't1'), hang=(), broken=()):
+    """
+    模擬多分頁的 driver：送出後遮罩維持兩次輪詢再顯示 answers 的結果
+    hang 內的查詢遮罩不消失；broken 內的查詢送出時丟出例外
+    錄製時擷取的 DOM 為目前分頁的結果列，用來確認錄製發生在分頁重新載入之前
+    """
+    pages = {h: {'ready': True, 'mask': 0, 'rows': []} for h in handles}
+    driver = SimpleNamespace(current=handles[0], submitted=[], closed=[])
+
+    def execute_script(script, *args):
+        page = pages[driver.current]
+        if script == tab_pool._POLL_SCRIPT:
+            if page['mask'] > 0:
+                page['mask'] -= 1
+            if not page['ready']:
+                page['ready'] = True  # 下一次輪詢時已載入完成
+                return {'ready': False, 'mask': False, 'rows': []}
+            mask = page['mask'] > 0
+            return {'ready': not mask, 'mask': mask, 'rows': page['rows']}
+        if script == tab_pool._SUBMIT_SCRIPT:
+            query = args[0]
+            if query in broken:
+                raise RuntimeError('tab crashed')
+            driver.submitted.append(query)
+            page.update(mask=10 ** 6 if query in hang else 3, rows=list(answers.get(query, [])))
+            return None
+        if script == tab_pool._NAVIGATE_SCRIPT:
+            page.update(ready=False, mask=0, rows=[])
+            return None
+        if script == moi_stub._DOM_SNAPSHOT_SCRIPT:
+            return {'ext-gen111': '、'.join(page['rows'])}
+        raise AssertionError(script)
+
+    def window(handle):
+        driver.current = handle
+
+    driver.execute_script = execute_script
+    driver.switch_to = SimpleNamespace(window=window)
+    driver.close = lambda: driver.closed.append(driver.current)
+    return driver
+
+
+def run(driver, queries, **kwargs):
+    kwargs.setdefault('handles', ['t0', 't1'])
+    return {q: r for _, q, r, _, _ in search_addresses_in_tabs(driver, queries, min_interval=0, mask_grace=0,
+                                                                poll_interval=0, **kwargs)}
+
+
+def test_all_queries_complete_and_reused_tabs_stay_open():
+    answers = {'a': ['A1', 'A2'], 'b': ['B1'], 'c': []}
+    driver = fake_tab_driver(answers)
+    assert run(driver, ['a', 'b', 'c']) == answers
+    assert sorted(driver.submitted) == ['a', 'b', 'c']
+    assert driver.closed == []
+    assert driver.current == 't0'  # 逐筆查詢回到第一個分頁
+
+
+def test_submit_failure_is_yielded_and_other_queries_continue():
+    driver = fake_tab_driver({'a': ['A1'], 'b': ['B1']}, broken=('a',))
+    results = run(driver, ['a', 'b'])
+    assert isinstance(results['a'], RuntimeError)
+    assert results['b'] == ['B1']
+
+
+def test_mask_that_never_clears_times_out():
+    driver = fake_tab_driver({'b': ['B1']}, hang=('a',))
+    results = run(driver, ['a', 'b'], timeout=0.05)
+    assert isinstance(results['a'], TimeoutError)
+    assert results['b'] == ['B1']
+
+
+def test_dead_tab_is_dropped_from_the_pool():
+    driver = fake_tab_driver({'a': ['A1'], 'b': ['B1']})
+    switch = driver.switch_to.window
+
+    def window(handle):
+        if handle == 't1':
+            raise RuntimeError('no such window')
+        switch(handle)
+
+    driver.switch_to.window = window
+    handles = ['t0', 't1']
+    assert run(driver, ['a', 'b'], handles=handles) == {'a': ['A1'], 'b': ['B1']}
+    assert handles == ['t0']
+
+
+def test_prefetch_records_every_tab_result(tmp_path, monkeypatch):
+    record_path = tmp_path / 'moi_recording.jsonl'
+    monkeypatch.setenv('MOI_RECORD', str(record_path))
+    driver = fake_tab_driver({'桃園區中正路1號': ['桃園區中正里1鄰中正路1號']})
+    cache = load_query_cache(str(tmp_path / 'query_cache.json'))
+
+    prefetched = prefetch_in_tabs(driver, ['桃園區中正路1號', '桃園區中正路2號'], cache, 2, handles=['t0', 't1'])
+    assert prefetched == {'桃園區中正路1號': ['桃園區中正里1鄰中正路1號'], '桃園區中正路2號': []}
+
+    recording = moi_stub.load_recording(str(record_path))
+    assert recording['桃園區中正路1號']['rows'] == ['桃園區中正里1鄰中正路1號']
+    assert recording['桃園區中正路1號']['dom'] == {'ext-gen111': '桃園區中正里1鄰中正路1號'}
+    assert recording['桃園區中正路2號']['result'] == '找不到結果'
@@ -0,0 +1,38 @@
+from .normalize import (simplify_address, fullwidth_to_halfwidth, format_simplified_address,
+                        visual_len, pad_text)
+from .rules import (load_exception_rules, get_exception_rules, remove_ling_with_condition,
+                    process_no_result_address)
+from .jurisdiction import (parse_house_number, parse_address_parts, build_jurisdiction_index,
+                           load_jurisdiction_index, resolve_jurisdiction)
+
+'''
+桃園地址查詢器核心套件。
+
+核心（正規化、規則、地址解析）只用標準函式庫，import 只需幾毫秒；
+瀏覽器（Selenium）與 Excel（openpyxl）後端在第一次用到時才載入：
+    from ty_address_finder import simplify_address          # 輕量
+    from ty_address_finder import setup_chrome_driver       # 此時才載入 Selenium
+'''
+
+# 延後載入的名稱 ➜ 所在模組
+_LAZY = {
+    'setup_chrome_driver': 'browser',
+    'search_address': 'browser',
+    'search_candidates': 'browser',
+    'search_address_candidates': 'moi_query',
+    'search_address_rows': 'moi_query',
+    'pick_candidate': 'moi_query',
+    'search_addresses_in_tabs': 'tab_pool',
+    'read_addresses': 'excel',
+    'jurisdiction_check': 'excel',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        module = importlib.import_module(f'.{_LAZY[name]}', __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,337 @@
+import os
+import time
+
+from .normalize import simplify_address, fullwidth_to_halfwidth, format_simplified_address, pad_text
+from .rules import remove_ling_with_condition, process_no_result_address
+from .jurisdiction import load_jurisdiction_index, resolve_jurisdiction
+from .query_cache import load_query_cache, save_query_cache, search_with_variants, cache_lookup, SAVE_EVERY
+from .circuit_breaker import (SiteUnavailable, new_breaker, guarded, breaker_record, breaker_is_open,
+                              breaker_probe_due, breaker_probe, breaker_seconds_until_probe)
+
+'''
+批量查詢：讀取 address_data.xlsx 的 B欄，逐筆查詢後寫回 A/C/D(/E) 欄。
+瀏覽器與 Excel 後端在 main 內才載入，只用 lookup_address 等函式時不需要 Selenium。
+'''
+
+# 近似結果（以鄰近門牌查到里鄰）在 C欄加註
+APPROXIMATE_NOTE = '(近似：里鄰取自鄰近門牌)'
+
+# 查到多筆候選時使用第一筆，其餘在 C欄加註
+CANDIDATES_NOTE = '(另有候選：{})'
+
+# 多分頁預查每次預查「分頁數 × PREFETCH_ROWS_PER_TAB」列，寫完再預查下一批
+PREFETCH_ROWS_PER_TAB = 10
+
+
+def prefetch_in_tabs(driver, addresses, query_cache, tab_count, breaker=None, on_result=None, handles=None):
+    """
+    多分頁預查：快取裡沒有的地址先用多個分頁併發查詢
+    每筆成敗即時記入斷路器，斷路器開啟就停止預查（其餘交給逐筆查詢延後處理）
+    on_result 有給時每完成一筆呼叫一次（分片查詢用來更新心跳）
+    handles 為 open_tabs 開好的分頁，整個執行期間重複使用；設定 MOI_RECORD 時每筆都會錄製
+    回傳 {簡化地址: 所有候選地址 list 或 Exception}
+    """
+    from .moi_stub import record_search
+    from .tab_pool import search_addresses_in_tabs
+
+    queries = []
+    seen = set()
+    for address in addresses:
+        if not address or str(address).strip() == 'nan':
+            continue
+        try:
+            query = simplify_address(address)[1]
+        except Exception:
+            continue  # 交給逐筆查詢時再處理
+        if query not in seen and cache_lookup(query_cache, query) is None:
+            seen.add(query)
+            queries.append(query)
+
+    prefetched = {}
+    if not queries:
+        return prefetched
+
+    results = search_addresses_in_tabs(driver, queries, tab_count, handles=handles)
+    try:
+        for _, query, rows, _, elapsed in results:
+            failed = isinstance(rows, Exception)
+            prefetched[query] = rows
+            if not failed:
+                # 此時分頁還停在結果頁，DOM 與逐筆查詢時錄到的一致
+                record_search(driver, query, rows[0] if rows else "找不到結果", elapsed, rows)
+            if on_result:
+                on_result()
+            if breaker is not None:
+                breaker_record(breaker, not failed, elapsed)
+                if breaker_is_open(breaker):
+                    break
+    finally:
+        results.close()  # 提早結束時讓分頁池收尾
+    return prefetched
+
+
+def lookup_address(i, address, search_fn, query_cache, max_len=50):
+    """
+    查詢單筆地址，回傳 (完整地址, 不含鄰地址)
+    斷路器開啟時丟出 SiteUnavailable，交由呼叫端延後查詢
+    """
+    try:
+        data_address, shorter_address, last_address = simplify_address(address)
+        # 快取命中不需等待；查無結果時會再試較寬鬆的寫法
+        result_address, _, approximate, candidates = search_with_variants(search_fn, shorter_address, query_cache)
+
+        if result_address == "找不到結果":
+
+            simplified = process_no_result_address(data_address)
+            simplified = remove_ling_with_condition(simplified)
+
+            if "里" in simplified:
+                full_address = "查無結果，使用原里鄰"
+                output = f"{i:04d}. {pad_text(address, max_len)} → {simplified}(查無結果，使用原里鄰)"
+            else:
+                full_address = "查無結果"
+                output = f"{i:04d}. {pad_text(address, max_len)} → 查無結果"
+
+            print(output)
+        else:
+            full_address = f'桃園市{result_address}{last_address}'
+            full_address = fullwidth_to_halfwidth(full_address)
+            full_address = full_address.replace(',', '，')
+
+            simplified = remove_ling_with_condition(full_address)
+
+            if approximate:
+                # 用鄰近門牌查到的里鄰，門牌是原地址，不能當成精確結果
+                full_address = f'{full_address}{APPROXIMATE_NOTE}'
+            if len(candidates) > 1:
+                # 網站回傳多筆時只用第一筆，其餘列出供人工確認
+                full_address = f"{full_address}{CANDIDATES_NOTE.format('、'.join(candidates[1:]))}"
+
+            output = f"{i:04d}. {pad_text(address, max_len)} → {full_address}"
+            print(output)
+
+    except SiteUnavailable:
+        raise
+    except Exception as e:
+        print(f"{i:04d}. {pad_text(address, max_len)} → 查詢失敗")
+        full_address = "查詢失敗"
+        simplified = process_no_result_address(address)
+
+    return full_address, simplified
+
+
+def make_search_fn(driver, breaker, prefetched=None):
+    """
+    建立查詢函式（回傳所有候選地址）：預查結果優先，其餘即時查詢（間隔 1.2 秒），並由斷路器把關
+    預查失敗的地址：斷路器開啟時延後查詢，否則記為查詢失敗
+    """
+    from .browser import search_candidates
+
+    prefetched = {} if prefetched is None else prefetched
+
+    def throttled_search(query):
+        time.sleep(1.2)  # 避免查詢過快被擋
+        return search_candidates(driver, query)
+
+    live_search = guarded(breaker, throttled_search)
+
+    def search(query):
+        if query not in prefetched:
+            return live_search(query)
+        result = prefetched.pop(query)
+        if not isinstance(result, Exception):
+            return result
+        # 預查失敗已記入斷路器，不再即時重查一次（避免再等一次逾時、重複計數）
+        if breaker_is_open(breaker):
+            raise SiteUnavailable(query)
+        raise result
+
+    return search
+
+
+def format_row(full_address, simplified, jurisdiction_index=None):
+    """
+    輸出欄位：回傳 (不含鄰的地址, 責任區)；沒有責任區表時責任區為 None
+    """
+    # 統一簡化地址格式
+    formatted_simplified = format_simplified_address(simplified)
+
+    zone = None
+    if jurisdiction_index:
+        # 責任區：完整地址優先，查無結果時用不含鄰的地址判斷里
+        zone = resolve_jurisdiction(jurisdiction_index, full_address) \
+            or resolve_jurisdiction(jurisdiction_index, formatted_simplified)
+    return formatted_simplified, zone
+
+
+def process_rows(rows, search_fn, query_cache, breaker, write_row, max_len=50, max_outage_wait=3600,
+                 prefetch=None, window=30, on_wait=None, fail_unresolved=True):
+    """
+    逐筆查詢 rows [(序號, 地址), ...]，每筆完成呼叫 write_row(序號, 完整地址, 不含鄰地址)
+    prefetch(地址列表) 有給時，每 window 列先批次預查一次再逐筆寫入，中斷時最多損失一批
+    斷路器開啟時該筆放入延後佇列，網站恢復後補查；
+    連續失敗期間查詢失敗的列先暫留，斷路器隨後開啟就一併延後（故障的前幾筆不會遺失），
+    查詢恢復成功才確定記為查詢失敗；
+    全部跑完還有延後的，最多再等 max_outage_wait 秒（每次等待前呼叫 on_wait），
+    仍未恢復則記為查詢失敗；fail_unresolved 為 False 時不寫入，留給下次重跑
+    回傳仍未查詢的 [(序號, 地址), ...]
+    """
+    rows = list(rows)
+    deferred = []
+    suspects = []  # 連續失敗中查詢失敗的列：(序號, 地址, 完整地址, 不含鄰地址)
+
+    def settle_suspects():
+        if breaker_is_open(breaker):
+            for i, address, _, _ in suspects:
+                print(f"{i:04d}. {pad_text(address, max_len)} → 網站暫停查詢，稍後重試")
+                deferred.append((i, address))
+            suspects.clear()
+        elif breaker['failures'] == 0:
+            for i, _, full_address, simplified in suspects:
+                write_row(i, full_address, simplified)
+            suspects.clear()
+
+    def finish(i, address, full_address, simplified):
+        if full_address == "查詢失敗" and breaker['failures'] > 0:
+            suspects.append((i, address, full_address, simplified))
+        else:
+            write_row(i, full_address, simplified)
+        settle_suspects()
+
+    def drain_deferred():
+        # 網站恢復後把延後佇列查完；途中再次故障就留待下次
+        while deferred and not breaker_is_open(breaker):
+            i, address = deferred[0]
+            try:
+                full_address, simplified = lookup_address(i, address, search_fn, query_cache, max_len)
+            except SiteUnavailable:
+                return
+            deferred.pop(0)
+            finish(i, address, full_address, simplified)
+
+    for n, (i, address) in enumerate(rows):
+        if breaker_probe_due(breaker) and breaker_probe(breaker):
+            drain_deferred()
+
+        if prefetch and n % window == 0 and not breaker_is_open(breaker):
+            prefetch([a for _, a in rows[n:n + window]])
+
+        if not address or str(address).strip() == 'nan':
+            print(f"{i:04d}. 空白資料")
+            write_row(i, "", "")
+            continue
+
+        try:
+            full_address, simplified = lookup_address(i, address, search_fn, query_cache, max_len)
+        except SiteUnavailable:
+            # 暫停中：快取查得到的照常完成，其餘延後
+            print(f"{i:04d}. {pad_text(address, max_len)} → 網站暫停查詢，稍後重試")
+            deferred.append((i, address))
+            settle_suspects()
+            continue
+        finish(i, address, full_address, simplified)
+
+    # 全部跑完還有延後的，等網站恢復再查；超過 max_outage_wait 秒放棄
+    outage_started = time.time()
+    while deferred:
+        if not breaker_is_open(breaker) or (breaker_probe_due(breaker) and breaker_probe(breaker)):
+            drain_deferred()
+            continue
+        if time.time() - outage_started > max_outage_wait:
+            break
+        print(f"[INFO] 尚有 {len(deferred)} 筆延後查詢，{breaker_seconds_until_probe(breaker):.0f} 秒後檢查網站")
+        if on_wait:
+            on_wait()
+        time.sleep(min(breaker_seconds_until_probe(breaker), max_outage_wait) + 0.1)
+
+    # 最後幾筆失敗但斷路器沒有開啟：確定記為查詢失敗
+    for i, _, full_address, simplified in suspects:
+        write_row(i, full_address, simplified)
+
+    if not fail_unresolved:
+        for i, address in deferred:
+            print(f"{i:04d}. {pad_text(address, max_len)} → 網站未恢復，留待下次重跑")
+        return deferred
+
+    for i, address in deferred:
+        print(f"{i:04d}. {pad_text(address, max_len)} → 查詢失敗（網站未恢復）")
+        write_row(i, "查詢失敗", process_no_result_address(address))
+    return []
+
+
+def main(file_path = "address_data.xlsx", jurisdiction_path = "責任區.xlsx", tab_count = 3, max_outage_wait = 3600):
+    from openpyxl import load_workbook
+
+    from .browser import setup_chrome_driver
+    from .excel import read_addresses, jurisdiction_check
+    from .tab_pool import open_tabs
+
+    #df = pd.read_excel(file_path)
+    #addresses = df['查詢地址'].tolist()
+    addresses = read_addresses(file_path)
+
+    # 編譯責任區表（沒有表就不填責任區欄）
+    jurisdiction_index = load_jurisdiction_index(jurisdiction_path)
+
+    # 查詢快取（含查無結果）
+    query_cache = load_query_cache()
+
+    # 斷路器：網站故障時暫停即時查詢，該筆放入延後佇列
+    breaker = new_breaker()
+
+    driver = setup_chrome_driver()
+
+    # 多分頁預查（tab_count 為 1 時維持逐筆查詢），分批進行、每批寫完再查下一批
+    prefetched = {}
+    search_fn = make_search_fn(driver, breaker, prefetched)
+
+    tab_handles = []  # 第一次預查時才開分頁，之後每批重複使用
+
+    def prefetch(batch):
+        if not tab_handles:
+            tab_handles.extend(open_tabs(driver, tab_count))
+        prefetched.update(prefetch_in_tabs(driver, batch, query_cache, tab_count, breaker,
+                                           handles=tab_handles))
+
+    # 開啟 Excel 用來逐筆寫入
+    wb = load_workbook(file_path)
+    ws = wb.active
+
+    if jurisdiction_index and not ws.cell(row=1, column=5).value:
+        ws.cell(row=1, column=5, value='責任區')
+
+    def write_row(i, full_address, simplified):
+        nonlocal unsaved
+        formatted_simplified, zone = format_row(full_address, simplified, jurisdiction_index)
+
+        # 寫入第 i+1 列（因為 Excel 有標題列）
+        ws.cell(row=i+1, column=1, value=i)  # A欄流水號
+        ws.cell(row=i+1, column=3, value=full_address)  # C欄：完整地址
+        ws.cell(row=i+1, column=4, value=formatted_simplified)  # D欄：不含鄰的地址
+        if jurisdiction_index:
+            ws.cell(row=i+1, column=5, value=zone)  # E欄：責任區
+
+        # 每筆處理完就儲存一次 Excel；快取整檔重寫較慢，每 SAVE_EVERY 筆存一次
+        wb.save(file_path)
+        unsaved += 1
+        if unsaved >= SAVE_EVERY:
+            save_query_cache(query_cache)
+            unsaved = 0
+
+    unsaved = 0
+    max_len = 50  # 用來對齊箭頭
+    try:
+        process_rows(enumerate(addresses, start=1), search_fn, query_cache, breaker, write_row, max_len,
+                     max_outage_wait, prefetch if tab_count > 1 else None, tab_count * PREFETCH_ROWS_PER_TAB)
+    finally:
+        save_query_cache(query_cache)
+
+    driver.quit()
+
+    # 有責任區表時 E欄已直接寫好，不再複製到 責任區.xlsx 用公式重算
+    if not jurisdiction_index and jurisdiction_check(file_path, jurisdiction_path):
+        print(f"✅ 責任區已更新，請查看：{jurisdiction_path}")
+        os.startfile(jurisdiction_path)
+    else:
+        print(f"✅ 查詢結束，請查看：{file_path}")
+        os.startfile(file_path)
@@ -0,0 +1,78 @@
+import os
+import time
+import logging
+import subprocess
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from .moi_stub import record_search
+from .moi_query import search_address_candidates, pick_candidate
+
+
+def setup_chrome_driver():
+    options = Options()
+
+    # --- Headless 模式設定 ---
+    options.add_argument('--headless=new')  # 啟用新版無頭模式，模擬真實瀏覽器但不開視窗
+    options.add_argument('--disable-gpu')   # 關閉 GPU 加速，避免在部分環境下造成錯誤
+    options.add_argument('--no-sandbox')    # 解除沙盒限制（Linux/Docker 無權限環境必加）
+    options.add_argument('--disable-dev-shm-usage')  # 避免 /dev/shm 空間不足導致崩潰（Docker 常見）
+    options.add_argument('--window-size=1920,1080')  # 指定視窗大小，確保頁面元素完整載入可見
+
+    # --- 日誌與自動化提示設定 ---
+    # 排除特定開關，以隱藏「Chrome 正在受自動化控制」提示及多餘的 console log
+    options.add_experimental_option(
+        'excludeSwitches', 
+        ['enable-logging', 'enable-automation']
+    )
+
+    # 關閉 Chrome 自動化擴展功能（減少被網站偵測的機率）
+    options.add_experimental_option('useAutomationExtension', False)
+
+    # --- 系統級日誌抑制設定 ---
+    # 將 Chrome 的內部 log 輸出導向無效位置
+    os.environ['CHROME_LOG_FILE'] = os.devnull  # Windows 使用 'NUL'
+    # os.environ['CHROME_LOG_FILE'] = '/dev/null'  # Linux/Mac 使用 /dev/null
+
+    # 降低 Selenium 與 urllib3 的日誌輸出層級，只顯示警告以上訊息
+    logging.getLogger('selenium').setLevel(logging.WARNING)
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+
+    # 建立並回傳 WebDriver 物件
+    # Create a Service that sends chromedriver logs to devnull and hides the console window on Windows
+    try:
+        creationflags = subprocess.CREATE_NO_WINDOW
+    except Exception:
+        creationflags = 0
+
+    service = Service(log_path=os.devnull)
+    # If supported, set creationflags to avoid spawning visible console windows for the driver
+    try:
+        service.creationflags = creationflags
+    except Exception:
+        pass
+
+    # Additional runtime flags to reduce Chrome GPU/log noise
+    options.add_argument('--log-level=3')
+    options.add_argument('--disable-software-rasterizer')
+
+    return webdriver.Chrome(service=service, options=options)
+
+
+def search_candidates(driver, address):
+    """ 查詢地址並回傳所有候選地址 list，查無結果為 []；有設定 MOI_RECORD 才會錄製 """
+    started = time.time()
+    # 一次 execute_async_script 完成填表、送出、等遮罩與讀取整個結果表
+    # （預設為內政部查詢頁，可用 MOI_QUERY_URL 改連本機替身）
+    candidates = search_address_candidates(driver, address)
+
+    result = candidates[0] if candidates else "找不到結果"
+    record_search(driver, address, result, time.time() - started, candidates)
+    return candidates
+
+
+def search_address(driver, address):
+    """ 即時查詢用：回傳第一筆候選（多筆時列出全部），查無結果回傳「找不到結果」 """
+    return pick_candidate(address, search_candidates(driver, address))
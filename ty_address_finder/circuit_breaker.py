@@ -0,0 +1,110 @@
+import time
+
+from .endpoint import query_url
+
+'''
+斷路器：網站故障或變慢時暫停即時查詢，避免每一筆都耗完逾時時間。
+
+- closed（正常）：連續 failure_threshold 次查詢失敗或超過 slow_threshold 秒，轉為 open
+- open（暫停）：不送即時查詢，呼叫端把該筆放入延後佇列；
+  cooldown 秒後可做一次健康檢查（直接 HTTP 讀取查詢頁，不經過瀏覽器）
+- 健康檢查成功轉回 closed，呼叫端再把延後佇列查完；失敗則 cooldown 加倍（上限 max_cooldown）
+'''
+
+
+class SiteUnavailable(Exception):
+    """ 斷路器開啟中，暫停即時查詢 """
+
+
+def new_breaker(failure_threshold=3, slow_threshold=20, cooldown=60, max_cooldown=600):
+    return {
+        'state': 'closed',
+        'failures': 0,
+        'opened_at': 0.0,
+        'failure_threshold': failure_threshold,
+        'slow_threshold': slow_threshold,
+        'base_cooldown': cooldown,
+        'cooldown': cooldown,
+        'max_cooldown': max_cooldown,
+    }
+
+
+def breaker_record(breaker, ok, elapsed=0.0, now=None):
+    """ 記錄一次即時查詢結果；過慢也算失敗 """
+    if ok and elapsed <= breaker['slow_threshold']:
+        breaker['failures'] = 0
+        return
+
+    breaker['failures'] += 1
+    if breaker['state'] == 'closed' and breaker['failures'] >= breaker['failure_threshold']:
+        breaker['state'] = 'open'
+        breaker['opened_at'] = time.time() if now is None else now
+        reason = '過慢' if ok else '失敗'
+        print(f"[WARN] 連續 {breaker['failures']} 次查詢{reason}，暫停查詢 {breaker['cooldown']} 秒")
+
+
+def breaker_is_open(breaker):
+    return breaker['state'] == 'open'
+
+
+def breaker_probe_due(breaker, now=None):
+    """ 斷路器開啟且已過冷卻時間，可以做健康檢查 """
+    now = time.time() if now is None else now
+    return breaker_is_open(breaker) and now - breaker['opened_at'] >= breaker['cooldown']
+
+
+def breaker_seconds_until_probe(breaker, now=None):
+    now = time.time() if now is None else now
+    return max(0.0, breaker['opened_at'] + breaker['cooldown'] - now)
+
+
+def probe_site(timeout=10):
+    """ 健康檢查：直接讀取查詢頁，回傳 (是否正常, 耗時秒數) """
+    import urllib.request  # 只有故障時才用到，延後載入
+
+    started = time.time()
+    try:
+        with urllib.request.urlopen(query_url(), timeout=timeout) as response:
+            ok = response.status == 200
+            response.read(1024)
+    except Exception:
+        ok = False
+    return ok, time.time() - started
+
+
+def breaker_probe(breaker, now=None):
+    """
+    做一次健康檢查並更新狀態，回傳斷路器是否已恢復（closed）
+    """
+    ok, elapsed = probe_site(timeout=breaker['slow_threshold'])
+    now = time.time() if now is None else now
+
+    if ok and elapsed <= breaker['slow_threshold']:
+        breaker.update(state='closed', failures=0, cooldown=breaker['base_cooldown'])
+        print("[INFO] 網站已恢復，繼續查詢")
+        return True
+
+    breaker['opened_at'] = now
+    breaker['cooldown'] = min(breaker['cooldown'] * 2, breaker['max_cooldown'])
+    print(f"[WARN] 網站仍無回應，{breaker['cooldown']} 秒後再檢查")
+    return False
+
+
+def guarded(breaker, search_fn):
+    """
+    包裝查詢函式：斷路器開啟時丟出 SiteUnavailable，否則照常查詢並記錄成敗與耗時
+    """
+    def search(query):
+        if breaker_is_open(breaker):
+            raise SiteUnavailable(query)
+        started = time.time()
+        try:
+            result = search_fn(query)
+        except Exception:
+            breaker_record(breaker, False)
+            if breaker_is_open(breaker):
+                raise SiteUnavailable(query)
+            raise
+        breaker_record(breaker, True, time.time() - started)
+        return result
+    return search
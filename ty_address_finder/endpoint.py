@@ -0,0 +1,12 @@
+import os
+
+'''
+查詢頁網址。預設為內政部門牌查詢頁，可用環境變數 MOI_QUERY_URL 指向本機替身（見 moi_stub）。
+'''
+
+MOI_QUERY_URL = 'https://addressrs.moi.gov.tw/address/index.cfm?city_id=68000'
+
+
+def query_url():
+    """ 查詢頁網址，可用環境變數 MOI_QUERY_URL 指向本機替身 """
+    return os.environ.get('MOI_QUERY_URL', MOI_QUERY_URL)
@@ -0,0 +1,48 @@
+import os
+
+from openpyxl import load_workbook
+
+
+def read_addresses(file_path):
+    wb = load_workbook(file_path)
+    ws = wb.active
+    return [ws.cell(row=i, column=2).value for i in range(2, ws.max_row + 1)]
+
+def jurisdiction_check(data_path = "address_data.xlsx",jurisdiction_path='責任區.xlsx'):
+    # 取得程式執行目錄
+    folder_path = os.getcwd()
+
+    # 檔案名稱
+    target_file = os.path.join(folder_path, jurisdiction_path)
+    source_file = os.path.join(folder_path, data_path)
+
+    if os.path.exists(target_file) and os.path.exists(source_file):
+        # 開啟 address_data.xlsx
+        wb_source = load_workbook(source_file)
+        ws_source = wb_source.active  # 假設資料在第一個工作表
+
+        # 開啟責任區.xlsx
+        wb_target = load_workbook(target_file)
+        
+        # 如果工作表不存在就建立
+        if "程式用" in wb_target.sheetnames:
+            ws_target = wb_target["程式用"]
+        else:
+            ws_target = wb_target.create_sheet("程式用")
+        
+        # 清空目標工作表的 A~D 欄舊資料（可選）
+        for row in ws_target.iter_rows(min_col=1, max_col=4, max_row=ws_target.max_row):
+            for cell in row:
+                cell.value = None
+
+        # 取得 source A~D 欄資料並寫入
+        for row_idx, row in enumerate(ws_source.iter_rows(min_col=1, max_col=4), start=1):
+            for col_idx, cell in enumerate(row, start=1):
+                ws_target.cell(row=row_idx, column=col_idx, value=cell.value)
+        
+        # 儲存修改
+        wb_target.save(target_file)
+        return True
+    else:
+        None
+        #print("資料夾內缺少必要檔案：責任區.xlsx 或 address_data.xlsx")
@@ -0,0 +1,222 @@
+import re
+import os
+from bisect import bisect_right
+
+from .normalize import format_simplified_address
+
+'''
+責任區解析：將「責任區表」編譯成索引，於程式內直接判斷地址所屬責任區，
+不再依賴 責任區.xlsx 內的公式重算。
+
+責任區表格式（第一列為標題）：
+    A欄 責任區 | B欄 行政區 | C欄 里 | D欄 路街(可含段/巷/弄) | E欄 起號 | F欄 迄號 | G欄 單雙
+- D欄空白：整個里都屬於該責任區
+- E、F欄空白：整條路街都屬於該責任區
+- 起迄號可寫「15之3」或「15-3」
+- G欄：「單」只收單號、「雙」只收雙號，其餘（空白、全）不分單雙
+'''
+
+JURISDICTION_SHEET = '責任區表'
+
+# 正規式第一次使用時才編譯（re 內建快取），讓 import 保持輕量
+_DISTRICT_RE = r'([一-鿿]{1,3}?區)'
+_LI_RE = r'([一-鿿]{1,3}[里村])'
+_STREET_RE = (
+    r'([一-鿿]+?(?:路|街|大道)(?:[一二三四五六七八九十]+段)?'
+    r'(?:\d+巷)?(?:\d+弄)?)(\d+(?:之\d+)?)號'
+)
+_NUMBER_RE = r'^\s*(\d+)\s*(?:[之\-]\s*(\d+))?\s*$'
+
+
+def parse_house_number(text):
+    """
+    將門牌號轉成可比較的 (號, 之號)，例如 '15之3' ➜ (15, 3)、'15' ➜ (15, 0)
+    Excel 讀出的整數值浮點數（15.0）也可解析；無法解析時回傳 None
+    """
+    if text is None:
+        return None
+    if isinstance(text, float):
+        if not text.is_integer():
+            return None
+        text = int(text)
+    m = re.match(_NUMBER_RE, str(text).replace('號', ''))
+    if not m:
+        return None
+    return int(m.group(1)), int(m.group(2) or 0)
+
+
+def parse_address_parts(address):
+    """
+    拆解地址為 (行政區, 里, 路街, 門牌號)
+    例：桃園市桃園區中正里5鄰中正路二段15之3號 ➜ ('桃園區', '中正里', '中正路二段', (15, 3))
+    拆不到的部分回傳空字串 / None
+    """
+    address = format_simplified_address(address).replace('桃園市', '', 1)
+
+    district = ''
+    m = re.match(_DISTRICT_RE, address)
+    if m:
+        district = m.group(1)
+        address = address[m.end():]
+
+    li = ''
+    m = re.match(_LI_RE, address)
+    if m:
+        li = m.group(1)
+        address = address[m.end():]
+
+    # 去掉鄰，剩下路街與門牌
+    address = re.sub(r'^\d{1,3}鄰', '', address)
+
+    street, number = '', None
+    m = re.search(_STREET_RE, address)
+    if m:
+        street = m.group(1)
+        number = parse_house_number(m.group(2))
+
+    return district, li, street, number
+
+
+def _is_blank(value):
+    return value is None or str(value).strip() == ''
+
+
+def load_jurisdiction_rules(jurisdiction_path='責任區.xlsx', sheet_name=JURISDICTION_SHEET):
+    """
+    讀取責任區表，回傳規則列表；檔案或工作表不存在時回傳空列表
+    """
+    if not os.path.exists(jurisdiction_path):
+        return []
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(jurisdiction_path, read_only=True, data_only=True)
+    if sheet_name not in wb.sheetnames:
+        wb.close()
+        return []
+
+    rules = []
+    for row_idx, row in enumerate(wb[sheet_name].iter_rows(min_row=2, max_col=7, values_only=True), start=2):
+        row = tuple(row) + (None,) * (7 - len(row))
+        zone, district, li, street, start, end, parity = row
+        if not zone:
+            continue
+
+        # 起迄號有填但看不懂時跳過整條規則，避免變成整條路街都算
+        bad = [v for v in (start, end) if not _is_blank(v) and parse_house_number(v) is None]
+        if bad:
+            print(f"[WARN] 責任區表第 {row_idx} 列門牌號無法解析（{'、'.join(map(str, bad))}），已略過")
+            continue
+
+        rules.append({
+            'zone': str(zone).strip(),
+            'district': str(district or '').strip(),
+            'li': str(li or '').strip(),
+            'street': str(street or '').strip().replace('-', '之'),
+            'start': parse_house_number(start),
+            'end': parse_house_number(end),
+            'parity': str(parity or '').strip(),
+        })
+    wb.close()
+    return rules
+
+
+def build_jurisdiction_index(rules):
+    """
+    將規則編譯為索引：
+    - 'street'：(行政區, 路街) ➜ 依起號排序的區間表，附帶「前綴最大迄號」，
+      查詢時以二分搜尋定位，再往回掃到前綴最大迄號小於門牌號即停止
+    - 'li'：(行政區, 里) ➜ 責任區
+    行政區空白的規則以 '' 為鍵，查詢時作為後備
+    里、路街名稱與查詢結果做相同的格式化（中正路2段 ➜ 中正路二段、全形轉半形）
+    """
+    streets = {}
+    lis = {}
+
+    for rule in rules:
+        district = format_simplified_address(rule['district'])
+        li = format_simplified_address(rule['li'])
+        street = format_simplified_address(rule['street'])
+        if not street:
+            if li:
+                lis.setdefault((district, li), rule['zone'])
+            continue
+
+        start = rule['start'] or (0, 0)
+        end = rule['end'] or (float('inf'), 0)
+        parity = 1 if rule['parity'] == '單' else 0 if rule['parity'] == '雙' else None
+        streets.setdefault((district, street), []).append(
+            (start, end, parity, rule['zone'])
+        )
+
+    for key, ranges in streets.items():
+        ranges.sort(key=lambda r: r[0])
+        prefix_max_end = []
+        max_end = None
+        for r in ranges:
+            max_end = r[1] if max_end is None or r[1] > max_end else max_end
+            prefix_max_end.append(max_end)
+        streets[key] = ([r[0] for r in ranges], ranges, prefix_max_end)
+
+    return {'street': streets, 'li': lis}
+
+
+def _lookup_street(entry, number):
+    starts, ranges, prefix_max_end = entry
+    i = bisect_right(starts, number) - 1
+    while i >= 0 and prefix_max_end[i] >= number:
+        start, end, parity, zone = ranges[i]
+        if end >= number and (parity is None or number[0] % 2 == parity):
+            return zone
+        i -= 1
+    return None
+
+
+def _street_candidates(street, number):
+    """
+    路街由細到粗：中正路100巷5弄3號 ➜ (中正路100巷5弄, 3號)、(中正路100巷, 5號)、(中正路, 100號)
+    """
+    candidates = []
+    while street:
+        candidates.append((street, number))
+        m = re.match(r'^(.+?)(\d+)[巷弄]$', street)
+        if not m:
+            break
+        street, number = m.group(1), (int(m.group(2)), 0)
+    return candidates
+
+
+def resolve_jurisdiction(index, address):
+    """
+    查詢地址所屬責任區，找不到回傳空字串
+    優先順序：路街+門牌區間 ➜ 上層路街（巷弄以巷號、弄號比對）➜ 里
+    """
+    if not index or not address:
+        return ''
+
+    district, li, street, number = parse_address_parts(address)
+
+    for street, number in _street_candidates(street, number):
+        for key in ((district, street), ('', street)):
+            entry = index['street'].get(key)
+            if entry is None:
+                continue
+            zone = _lookup_street(entry, number or (0, 0))
+            if zone:
+                return zone
+
+    if li:
+        for key in ((district, li), ('', li)):
+            zone = index['li'].get(key)
+            if zone:
+                return zone
+
+    return ''
+
+
+def load_jurisdiction_index(jurisdiction_path='責任區.xlsx', sheet_name=JURISDICTION_SHEET):
+    """ 讀取並編譯責任區表，沒有表時回傳 None """
+    rules = load_jurisdiction_rules(jurisdiction_path, sheet_name)
+    if not rules:
+        return None
+    return build_jurisdiction_index(rules)
@@ -0,0 +1,129 @@
+from .endpoint import query_url
+
+'''
+單次往返查詢：填表、送出、等待遮罩、讀取整個結果表，
+全部在一次 execute_async_script 內完成，不再逐一呼叫 find_element / send_keys / click。
+查詢頁已載入時只需一次往返；頁面不在查詢頁時才 driver.get 重新載入。
+'''
+
+# 結果表每一列；第二欄為地址
+ROW_XPATH = '//*[@id="ext-gen111"]/div/table/tbody/tr'
+
+_SEARCH_SCRIPT = '''
+var address = arguments[0], readyWait = arguments[1] * 1000,
+    maskGrace = arguments[2] * 1000, timeout = arguments[3] * 1000,
+    done = arguments[arguments.length - 1];
+var ROW_XPATH = '%s';
+
+function snapshot() {
+    return document.evaluate(ROW_XPATH, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+}
+
+function freshRows() {
+    var rows = [], found = snapshot();
+    for (var i = 0; i < found.snapshotLength; i++) {
+        var tr = found.snapshotItem(i);
+        if (tr.getAttribute('data-ty-stale')) { continue; }
+        var cells = [];
+        for (var j = 0; j < tr.cells.length; j++) { cells.push(tr.cells[j].textContent.trim()); }
+        rows.push(cells);
+    }
+    return rows;
+}
+
+function submit() {
+    // 標記上一筆的結果列與殘留遮罩，避免誤讀舊結果、把舊遮罩當成這次的查詢
+    var old = snapshot();
+    for (var i = 0; i < old.snapshotLength; i++) { old.snapshotItem(i).setAttribute('data-ty-stale', '1'); }
+    var masks = document.querySelectorAll('.ext-el-mask');
+    for (var m = 0; m < masks.length; m++) { masks[m].setAttribute('data-ty-stale', '1'); }
+
+    var box = document.getElementById('FreeText_ADDR');
+    box.value = address;
+    box.dispatchEvent(new Event('input', {bubbles: true}));
+    box.dispatchEvent(new Event('change', {bubbles: true}));
+    document.getElementById('ext-gen51').click();
+
+    var start = Date.now(), maskSeen = false;
+    (function poll() {
+        var elapsed = Date.now() - start;
+        if (document.querySelector('.ext-el-mask:not([data-ty-stale])')) {
+            maskSeen = true;
+            if (elapsed > timeout) { done({status: 'timeout'}); return; }
+        } else {
+            var rows = freshRows();
+            // 遮罩出現又消失、已有新結果，或遮罩一直沒出現超過寬限時間
+            if (maskSeen || rows.length || elapsed > maskGrace) { done({status: 'ok', rows: rows}); return; }
+        }
+        setTimeout(poll, 50);
+    })();
+}
+
+var waitStart = Date.now();
+(function waitReady() {
+    // 上一筆逾時留下的遮罩還在時不算就緒，等它消失或重新載入
+    if (document.readyState === 'complete' && document.getElementById('FreeText_ADDR')
+            && document.getElementById('ext-gen51') && !document.querySelector('.ext-el-mask')) {
+        submit();
+    } else if (Date.now() - waitStart >= readyWait) {
+        done({status: 'not_ready'});
+    } else {
+        setTimeout(waitReady, 50);
+    }
+})();
+''' % ROW_XPATH
+
+
+def _reload(driver):
+    """ 重新載入查詢頁，清掉逾時留下的遮罩；載入失敗留給下一筆處理 """
+    try:
+        driver.get(query_url())
+    except Exception:
+        pass
+
+
+def search_address_rows(driver, address, ready_wait=10, mask_grace=10, timeout=30):
+    """
+    查詢地址並回傳結果表所有列，每列為各欄文字 list（第二欄為地址）；查無結果回傳 []
+    遮罩超過 timeout 秒未消失時丟出 TimeoutException；逾時或出錯後會重新載入查詢頁
+    """
+    from selenium.common.exceptions import TimeoutException
+
+    script_timeout = ready_wait + timeout + 5
+    if getattr(driver, '_ty_script_timeout', None) != script_timeout:
+        driver.set_script_timeout(script_timeout)
+        driver._ty_script_timeout = script_timeout
+
+    try:
+        # 先直接在目前頁面查；不在查詢頁（或還有殘留遮罩）才重新載入
+        outcome = driver.execute_async_script(_SEARCH_SCRIPT, address, 0, mask_grace, timeout)
+        if outcome['status'] == 'not_ready':
+            driver.get(query_url())
+            outcome = driver.execute_async_script(_SEARCH_SCRIPT, address, ready_wait, mask_grace, timeout)
+    except Exception:
+        _reload(driver)
+        raise
+
+    if outcome['status'] == 'not_ready':
+        _reload(driver)
+        raise TimeoutException(f'查詢頁載入逾時：{address}')
+    if outcome['status'] == 'timeout':
+        _reload(driver)  # 遮罩還在，不重新載入的話之後每一筆都會卡住
+        raise TimeoutException(f'查詢遮罩未消失：{address}')
+    return outcome['rows']
+
+
+def search_address_candidates(driver, address, **kwargs):
+    """ 查詢地址並回傳所有候選地址（結果表第二欄） """
+    return [row[1].strip() for row in search_address_rows(driver, address, **kwargs)
+            if len(row) > 1 and row[1].strip()]
+
+
+def pick_candidate(address, candidates):
+    """
+    從候選地址取第一筆；有多筆時列出全部供人工確認，沒有則回傳「找不到結果」
+    （即時查詢用；批量查詢保留所有候選，由 C欄加註）
+    """
+    if len(candidates) > 1:
+        print(f"[INFO] {address} 有 {len(candidates)} 筆候選，使用第一筆：{'、'.join(candidates)}")
+    return candidates[0] if candidates else "找不到結果"
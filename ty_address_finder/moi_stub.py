@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+'''
+門牌查詢頁的錄製 / 重播替身，用於離線壓測、效能測試與回歸測試。
+
+錄製：設定環境變數 MOI_RECORD=moi_recording.jsonl 後照常執行查詢器，
+      每筆查詢的地址、結果、耗時，以及程式依賴的 DOM 結構
+      （FreeText_ADDR、ext-gen51、ext-el-mask、ext-gen111 表格）會逐行寫入。
+重播：python -m ty_address_finder.moi_stub --recording moi_recording.jsonl --port 8765 --latency 0.5 --jitter 0.2 --failure-rate 0.05
+切換：設定環境變數 MOI_QUERY_URL=http://127.0.0.1:8765/address/index.cfm?city_id=68000
+      兩支查詢器都會改連本機替身。
+'''
+
+# 錄製時擷取的 DOM 片段，依程式實際使用的 id / class
+_DOM_SNAPSHOT_SCRIPT = '''
+var pick = function (el) { return el ? el.outerHTML : null; };
+return {
+    FreeText_ADDR: pick(document.getElementById('FreeText_ADDR')),
+    "ext-gen51": pick(document.getElementById('ext-gen51')),
+    "ext-el-mask": pick(document.querySelector('.ext-el-mask')),
+    "ext-gen111": pick(document.getElementById('ext-gen111'))
+};
+'''
+
+_record_lock = threading.Lock()
+
+
+def record_search(driver, query, result, elapsed, rows=None, record_path=None):
+    """
+    把一次查詢記錄到錄製檔（未設定 MOI_RECORD 時不做事）
+    rows 為結果表所有候選地址
+    錄製失敗只警告，不影響查詢
+    """
+    record_path = record_path or os.environ.get('MOI_RECORD')
+    if not record_path:
+        return
+
+    try:
+        dom = driver.execute_script(_DOM_SNAPSHOT_SCRIPT)
+    except Exception as e:
+        print(f"[WARN] 錄製 DOM 失敗：{e}")
+        dom = {}
+
+    line = json.dumps({
+        'query': query,
+        'result': result,
+        'rows': rows,
+        'elapsed': round(elapsed, 3),
+        'dom': dom,
+        'time': time.time(),
+    }, ensure_ascii=False)
+
+    with _record_lock:
+        with open(record_path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+def load_recording(record_path):
+    """ 讀取錄製檔，回傳 {查詢字串: 記錄}；同一查詢以最後一筆為準 """
+    recording = {}
+    if not record_path or not os.path.exists(record_path):
+        return recording
+    with open(record_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            recording[entry['query']] = entry
+    return recording
+
+
+# 重播頁：保留查詢器依賴的 id / class，查詢時出現遮罩、回應後才移除
+_PAGE_HTML = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>門牌查詢（替身）</title></head>
+<body>
+<input type="text" id="FreeText_ADDR" name="FreeText_ADDR">
+<button type="button" id="ext-gen51">查詢</button>
+<div id="ext-gen97" class="x-panel-bwrap">
+  <div id="ext-gen111" class="x-grid3-body"></div>
+</div>
+<script>
+document.getElementById('ext-gen51').addEventListener('click', function () {
+    var addr = document.getElementById('FreeText_ADDR').value;
+    var mask = document.createElement('div');
+    mask.className = 'ext-el-mask';
+    document.getElementById('ext-gen97').appendChild(mask);
+    fetch('/query?addr=' + encodeURIComponent(addr))
+        .then(function (r) { if (!r.ok) { throw new Error(r.status); } return r.json(); })
+        .then(function (data) {
+            var grid = document.getElementById('ext-gen111');
+            if (data.grid_html) {
+                grid.outerHTML = data.grid_html;
+            } else {
+                grid.innerHTML = '';
+                data.rows.forEach(function (row, i) {
+                    var div = document.createElement('div');
+                    div.className = 'x-grid3-row';
+                    div.innerHTML = '<table class="x-grid3-row-table"><tbody><tr>' +
+                        '<td class="x-grid3-cell"><div class="x-grid3-cell-inner">' + (i + 1) + '</div></td>' +
+                        '<td class="x-grid3-cell"><div class="x-grid3-cell-inner"></div></td>' +
+                        '</tr></tbody></table>';
+                    div.querySelectorAll('.x-grid3-cell-inner')[1].textContent = row;
+                    grid.appendChild(div);
+                });
+            }
+            mask.parentNode.removeChild(mask);
+        })
+        .catch(function () { /* 模擬網站卡住：遮罩不消失 */ });
+});
+</script>
+</body></html>
+'''
+
+
+def make_handler(recording, latency=0.0, jitter=0.0, failure_rate=0.0, rng=None):
+    """
+    建立重播用的 request handler
+    latency / jitter：每次查詢延遲 latency ± jitter 秒
+    failure_rate：查詢回 503 的機率（頁面遮罩會一直留著，模擬網站故障）
+    """
+    rng = rng or random.Random()
+    rng_lock = threading.Lock()
+
+    class MoiStubHandler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):   # 壓測時不要洗版
+            pass
+
+        def _send(self, status, body, content_type):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+
+            if url.path == '/query':
+                with rng_lock:
+                    delay = max(0.0, latency + rng.uniform(-jitter, jitter))
+                    failed = rng.random() < failure_rate
+                time.sleep(delay)
+                if failed:
+                    self._send(503, '{}', 'application/json')
+                    return
+
+                addr = parse_qs(url.query).get('addr', [''])[0]
+                entry = recording.get(addr)
+                if entry is None:
+                    payload = {'rows': []}
+                elif entry.get('dom', {}).get('ext-gen111'):
+                    payload = {'grid_html': entry['dom']['ext-gen111']}
+                else:
+                    rows = entry.get('rows') or ([] if entry['result'] == '找不到結果' else [entry['result']])
+                    payload = {'rows': rows}
+                self._send(200, json.dumps(payload, ensure_ascii=False), 'application/json; charset=utf-8')
+                return
+
+            # 其餘路徑（含 /address/index.cfm）都回查詢頁
+            self._send(200, _PAGE_HTML, 'text/html; charset=utf-8')
+
+    return MoiStubHandler
+
+
+def serve(recording, host='127.0.0.1', port=8765, latency=0.0, jitter=0.0, failure_rate=0.0, seed=None):
+    """ 建立重播伺服器（尚未啟動），recording 為 load_recording 的結果 """
+    handler = make_handler(recording, latency, jitter, failure_rate, random.Random(seed))
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='門牌查詢頁重播替身')
+    parser.add_argument('--recording', default='moi_recording.jsonl', help='錄製檔路徑')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='每次查詢延遲秒數')
+    parser.add_argument('--jitter', type=float, default=0.0, help='延遲隨機浮動秒數')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='查詢失敗機率 0~1')
+    parser.add_argument('--seed', type=int, default=None, help='隨機種子，方便重現')
+    args = parser.parse_args(argv)
+
+    recording = load_recording(args.recording)
+    server = serve(recording, args.host, args.port, args.latency, args.jitter, args.failure_rate, args.seed)
+    url = f'http://{args.host}:{server.server_address[1]}/address/index.cfm?city_id=68000'
+    print(f"✅ 替身已啟動，共 {len(recording)} 筆錄製資料")
+    print(f"   set MOI_QUERY_URL={url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import re
+import os
+import json
+import time
+
+'''
+查詢快取：
+- 查到的結果與「找不到結果」都記在 query_cache.json，下次執行直接使用
+- 查無結果的 TTL 較短，過期後會重新查詢
+- 查無結果前會先試幾種較寬鬆的查詢寫法，成功的寫法會記下來，
+  下次同一地址優先使用，整體也會依成功次數排序
+- 寫法分兩類：
+  不改門牌（去縣市、段號改阿拉伯數字）查到的結果就是原地址；
+  會改門牌（去之號、去弄）查到的是鄰近門牌，只取其里鄰、門牌換回原地址，並標記為近似
+'''
+
+CACHE_PATH = 'query_cache.json'
+NO_RESULT = '找不到結果'
+
+HIT_TTL = 30 * 24 * 3600   # 查到結果：30 天
+MISS_TTL = 3 * 24 * 3600   # 查無結果：3 天
+MAX_VARIANTS = 4           # 原查詢之外最多再試幾種寫法
+SAVE_EVERY = 50            # 批量查詢每幾筆存一次快取（結束時一定會存）
+
+
+_SECTION_TO_DIGIT = {'一': '1', '二': '2', '三': '3', '四': '4', '五': '5',
+                     '六': '6', '七': '7', '八': '8', '九': '9'}
+
+
+def _drop_city(address):       # 去縣市：桃園市桃園區… ➜ 桃園區…（本來就只查桃園）
+    return re.sub(r'^桃園[市縣]', '', address)
+
+
+def _arabic_section(address):  # 段號改阿拉伯數字：中正路二段 ➜ 中正路2段
+    return re.sub(r'([一二三四五六七八九])段', lambda m: _SECTION_TO_DIGIT[m.group(1)] + '段', address)
+
+
+def _drop_zhi(address):        # 去之號：15之3號 ➜ 15號
+    return re.sub(r'(\d+)之\d+號', r'\1號', address)
+
+
+def _collapse_lane(address):   # 去弄：100巷5弄3號 ➜ 100巷3號
+    return re.sub(r'(\d+巷)\d+弄', r'\1', address)
+
+
+# 預設順序：不改門牌的寫法先試
+VARIANT_RULES = {
+    'drop_city': _drop_city,
+    'arabic_section': _arabic_section,
+    'drop_zhi': _drop_zhi,
+    'collapse_lane': _collapse_lane,
+}
+
+# 不改門牌的寫法：查到的就是原地址，一定排在會改門牌的寫法之前
+EXACT_RULES = ('drop_city', 'arabic_section')
+
+
+def _same_house_key(address):
+    """ 去掉不影響門牌的寫法差異，用來判斷變體是否還是同一個門牌 """
+    return _arabic_section(_drop_city(address))
+
+
+def is_approximate(address, query):
+    """ 變體查詢的門牌是否已和原地址不同 """
+    return _same_house_key(address) != _same_house_key(query)
+
+
+def rebuild_with_house(result, address):
+    """
+    近似結果只取「區里鄰」，門牌換回原地址：
+    ('桃園區中正里5鄰中正路15號', '桃園區中正路15之3號') ➜ '桃園區中正里5鄰中正路15之3號'
+    結果沒有鄰時無法套用，回傳 None
+    """
+    m = re.match(r'^(.*?\d+鄰)', result)
+    if not m:
+        return None
+    street = re.sub(r'^(?:桃園[市縣])?(?:[一-鿿]{1,3}?區)?', '', address)
+    return m.group(1) + street
+
+
+def load_query_cache(cache_path=CACHE_PATH):
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            cache.setdefault('entries', {})
+            cache.setdefault('variant_stats', {})
+            return cache
+        except (OSError, ValueError):
+            print(f"[WARN] 快取檔讀取失敗，重新建立：{cache_path}")
+    return {'entries': {}, 'variant_stats': {}}
+
+
+def save_query_cache(cache, cache_path=CACHE_PATH):
+    # 先寫暫存檔再取代，避免中途中斷把快取寫壞；暫存檔名含程序編號，多個程序同時存也不會互相覆蓋
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        # 快取只是加速用，存不進去（例如其他程序正開著檔案）就下次再存，不中斷查詢
+        print(f"[WARN] 快取儲存失敗：{e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def cache_lookup(cache, address, now=None):
+    """
+    回傳快取中的結果（含 NO_RESULT），沒有或已過期回傳 None
+    """
+    entry = cache_entry(cache, address, now)
+    return entry['result'] if entry else None
+
+
+def cache_entry(cache, address, now=None):
+    """ 回傳未過期的快取項目，沒有或已過期回傳 None """
+    entry = cache['entries'].get(address)
+    if not entry:
+        return None
+    now = time.time() if now is None else now
+    ttl = MISS_TTL if entry['result'] == NO_RESULT else HIT_TTL
+    if now - entry['time'] > ttl:
+        return None
+    return entry
+
+
+def cache_store(cache, address, result, variant=None, query=None, approximate=False, now=None,
+                candidates=None):
+    cache['entries'][address] = {
+        'result': result,
+        'variant': variant,
+        'query': query,
+        'approximate': approximate,
+        'candidates': candidates or ([] if result == NO_RESULT else [result]),
+        'time': time.time() if now is None else now,
+    }
+
+
+def entry_candidates(entry):
+    """ 快取項目的所有候選地址（舊版快取沒有記錄時只有結果本身） """
+    if entry.get('candidates'):
+        return entry['candidates']
+    return [] if entry['result'] == NO_RESULT else [entry['result']]
+
+
+def query_variants(address, preferred=None, variant_stats=None, max_variants=MAX_VARIANTS):
+    """
+    產生較寬鬆的查詢寫法 [(規則名稱, 查詢字串), ...]，不含原查詢、不重複
+    排序：不改門牌的規則一律在前（EXACT_RULES），各組內再依
+    上次對此地址成功的規則 ➜ 整體成功次數多的規則 ➜ 預設順序
+    規則可疊加：後面的寫法建立在前面已放寬的結果上，
+    因此會改門牌的寫法是從最寬鬆的精確寫法再放寬，精確寫法不會被跳過
+    """
+    stats = variant_stats or {}
+    names = sorted(VARIANT_RULES, key=lambda n: (n not in EXACT_RULES, n != preferred, -stats.get(n, 0)))
+
+    variants = []
+    seen = {address}
+    current = address
+    for name in names:
+        candidate = VARIANT_RULES[name](current)
+        if candidate in seen or not candidate:
+            continue
+        seen.add(candidate)
+        variants.append((name, candidate))
+        current = candidate
+        if len(variants) >= max_variants:
+            break
+    return variants
+
+
+def search_with_variants(search_fn, address, cache, max_variants=MAX_VARIANTS):
+    """
+    帶快取的查詢，search_fn(查詢字串) 回傳所有候選地址 list（查無結果為 []）：
+    1. 快取有效就直接回傳
+    2. 查原地址，查無結果再依序試 query_variants
+    3. 會改門牌的變體查到時，只取里鄰、門牌換回原地址（rebuild_with_house），並標記為近似；
+       結果沒有鄰可取時視為查無結果
+    4. 結果（含查無結果、所有候選）寫回快取；查詢中的例外不寫入快取，交由呼叫端處理
+    回傳 (結果, 是否來自快取, 是否近似, 所有候選)；結果為第一筆候選，多於一筆時由呼叫端標示
+    """
+    entry = cache_entry(cache, address)
+    if entry is not None:
+        return entry['result'], True, entry.get('approximate', False), entry_candidates(entry)
+
+    entry = cache['entries'].get(address) or {}
+    preferred, preferred_query = entry.get('variant'), entry.get('query')
+
+    ladder = [(None, address)] + query_variants(address, preferred, cache['variant_stats'], max_variants)
+    # 上次成功的寫法先試，省下一次必定查無的原查詢
+    if preferred and preferred_query:
+        ladder = [(preferred, preferred_query)] + [v for v in ladder if v[1] != preferred_query]
+
+    for name, query in ladder:
+        candidates = search_fn(query)
+        if not candidates:
+            continue
+
+        approximate = name is not None and is_approximate(address, query)
+        if approximate:
+            # 各候選的里鄰套回原門牌，相同的合併
+            rebuilt = [rebuild_with_house(c, address) for c in candidates]
+            candidates = list(dict.fromkeys(c for c in rebuilt if c))
+            if not candidates:
+                continue
+
+        result = candidates[0]
+        cache_store(cache, address, result, name, query, approximate, candidates=candidates)
+        if name:
+            cache['variant_stats'][name] = cache['variant_stats'].get(name, 0) + 1
+        return result, False, approximate, candidates
+
+    cache_store(cache, address, NO_RESULT, preferred, preferred_query)
+    return NO_RESULT, False, False, []
@@ -0,0 +1,48 @@
+import re
+import os
+import json
+
+
+def load_exception_rules(json_path='exception_rules.json'): # 排除特定里鄰規則
+    if os.path.exists(json_path):
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"require_ling": []}
+
+
+_exception_rules = None
+
+
+def get_exception_rules():
+    """ 第一次用到時才讀取 exception_rules.json，之後沿用 """
+    global _exception_rules
+    if _exception_rules is None:
+        _exception_rules = load_exception_rules()
+        #print("Loaded Exception Rules:", _exception_rules)
+    return _exception_rules
+
+
+def remove_ling_with_condition(full_address, require_ling=None):
+    # 名單內的里，保留鄰（require_ling 未指定時使用 exception_rules.json）
+    if require_ling is None:
+        require_ling = get_exception_rules().get("require_ling", [])
+
+    for special_li in require_ling:
+        if special_li in full_address:
+            return full_address
+        
+    # 否則執行標準簡化：刪除「里」與「鄰」間文字（含鄰）
+    return re.sub(r'(里).*?鄰', r'\1', full_address)
+
+
+def process_no_result_address(original_address):
+    """
+    處理查無結果的地址：如果原地址有「里」，直接放到「不含鄰的地址」欄
+    """
+    if "里" in original_address:
+        if "桃園市" not in original_address:
+            original_address = f'桃園市{original_address}'
+        # 非例外里，只要有「里」就保留
+        return original_address
+    else:
+        return "查詢失敗"
@@ -0,0 +1,381 @@
+import os
+import sys
+import json
+import time
+import socket
+import hashlib
+import argparse
+
+from .normalize import simplify_address
+from .jurisdiction import load_jurisdiction_index
+from .query_cache import load_query_cache, save_query_cache, SAVE_EVERY
+from .circuit_breaker import new_breaker
+from .batch import prefetch_in_tabs, make_search_fn, format_row, process_rows, PREFETCH_ROWS_PER_TAB
+
+'''
+分片批量查詢：多台電腦共用一個資料夾（網路磁碟即可），不需要額外服務。
+
+1. 拆分：python -m ty_address_finder.shard split --work-dir 共用資料夾 --shards 16
+   依正規化後地址的雜湊分片，相同地址會落在同一片，快取可以重複利用。
+2. 查詢：每台電腦執行 python -m ty_address_finder.shard work --work-dir 共用資料夾
+   以改名（rename）搶分片，每片有自己的紀錄檔，中斷後重跑會從紀錄接續。
+3. 回收：節點當機時，python -m ty_address_finder.shard reclaim --work-dir 共用資料夾
+   把太久沒有動靜的分片放回佇列，由其他節點接手（已完成的列不會重查）。
+4. 合併：python -m ty_address_finder.shard merge --work-dir 共用資料夾
+   依原始列號寫回 A/C/D(/E) 欄，結果與節點完成順序無關。
+
+共用資料夾結構：
+    manifest.json        來源檔、列數、分片數、B欄摘要
+    queue/shard_0000.json               待查分片
+    claimed/shard_0000@節點.json        查詢中（檔案時間即心跳）
+    done/shard_0000.json                已完成
+    journal/shard_0000.jsonl            每列結果，一行一筆
+'''
+
+MANIFEST = 'manifest.json'
+QUEUE_DIR = 'queue'
+CLAIMED_DIR = 'claimed'
+DONE_DIR = 'done'
+JOURNAL_DIR = 'journal'
+
+
+def shard_key(address):
+    """ 分片依據：正規化後的地址，讓寫法不同的相同地址落在同一片 """
+    if not address or str(address).strip() == 'nan':
+        return ''
+    try:
+        return simplify_address(str(address))[1]
+    except Exception:
+        return str(address).strip()
+
+
+def shard_of(address, shard_count):
+    # 使用 md5 而非 hash()，確保每台電腦、每次執行結果一致
+    digest = hashlib.md5(shard_key(address).encode('utf-8')).hexdigest()
+    return int(digest[:8], 16) % shard_count
+
+
+def addresses_digest(addresses):
+    """ B欄內容摘要，合併時確認來源檔沒有被改動 """
+    h = hashlib.md5()
+    for address in addresses:
+        h.update(repr(address).encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+def _path(work_dir, *parts):
+    return os.path.join(work_dir, *parts)
+
+
+def _write_json(path, data):
+    # 先寫暫存檔再改名，其他節點不會讀到寫一半的檔案
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _shard_name(file_name):
+    """ 'shard_0003@node1.json' ➜ 'shard_0003' """
+    return os.path.splitext(file_name)[0].split('@', 1)[0]
+
+
+def split_shards(work_dir, file_path='address_data.xlsx', shard_count=16):
+    """
+    拆分 file_path 的 B欄到 work_dir/queue，回傳各分片筆數
+    """
+    from .excel import read_addresses
+
+    addresses = read_addresses(file_path)
+
+    for name in (QUEUE_DIR, CLAIMED_DIR, DONE_DIR, JOURNAL_DIR):
+        os.makedirs(_path(work_dir, name), exist_ok=True)
+    if os.listdir(_path(work_dir, QUEUE_DIR)) or os.listdir(_path(work_dir, CLAIMED_DIR)) \
+            or os.listdir(_path(work_dir, DONE_DIR)):
+        raise FileExistsError(f'{work_dir} 已有分片，請換一個資料夾')
+
+    shards = [[] for _ in range(shard_count)]
+    for i, address in enumerate(addresses, start=1):
+        shards[shard_of(address, shard_count)].append([i, address])
+
+    for k, rows in enumerate(shards):
+        if rows:
+            _write_json(_path(work_dir, QUEUE_DIR, f'shard_{k:04d}.json'), {'shard': k, 'rows': rows})
+
+    _write_json(_path(work_dir, MANIFEST), {
+        'source': os.path.abspath(file_path),
+        'rows': len(addresses),
+        'shard_count': shard_count,
+        'digest': addresses_digest(addresses),
+        'created': time.time(),
+    })
+    return [len(rows) for rows in shards]
+
+
+def claim_shard(work_dir, node_id):
+    """
+    搶一個分片：先接續自己先前沒做完的，再從佇列改名取得
+    改名是原子操作，兩個節點搶同一片時只有一個會成功
+    回傳 claimed 內的檔案路徑，佇列空了回傳 None
+    """
+    claimed_dir = _path(work_dir, CLAIMED_DIR)
+    for name in sorted(os.listdir(claimed_dir)):
+        if name.endswith(f'@{node_id}.json'):
+            return os.path.join(claimed_dir, name)
+
+    queue_dir = _path(work_dir, QUEUE_DIR)
+    for name in sorted(os.listdir(queue_dir)):
+        if not name.endswith('.json'):
+            continue
+        target = os.path.join(claimed_dir, f'{_shard_name(name)}@{node_id}.json')
+        try:
+            os.rename(os.path.join(queue_dir, name), target)
+        except OSError:
+            continue  # 被其他節點搶走
+        return target
+    return None
+
+
+def read_journal(journal_path):
+    """ 讀取分片紀錄，回傳 {列號: (完整地址, 不含鄰地址)}；同一列以最後一筆為準 """
+    results = {}
+    if not os.path.exists(journal_path):
+        return results
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # 中斷時寫到一半的最後一行
+            results[entry['row']] = (entry['full_address'], entry['simplified'])
+    return results
+
+
+def _ends_with_newline(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def reclaim_stale(work_dir, stale_after=1800):
+    """ 把超過 stale_after 秒沒有心跳的分片放回佇列，回傳放回的分片名稱 """
+    claimed_dir = _path(work_dir, CLAIMED_DIR)
+    now = time.time()
+    reclaimed = []
+    for name in sorted(os.listdir(claimed_dir)):
+        path = os.path.join(claimed_dir, name)
+        if now - os.path.getmtime(path) < stale_after:
+            continue
+        try:
+            os.rename(path, _path(work_dir, QUEUE_DIR, f'{_shard_name(name)}.json'))
+        except OSError:
+            continue
+        reclaimed.append(_shard_name(name))
+    return reclaimed
+
+
+def run_worker(work_dir, node_id=None, tab_count=3, max_outage_wait=3600):
+    """
+    節點主程式：反覆搶分片、查詢、寫紀錄，直到佇列清空
+    網站故障超過 max_outage_wait 仍未恢復時，把分片放回佇列並提前停止
+    回傳完成的分片數
+    """
+    from .browser import setup_chrome_driver
+    from .tab_pool import open_tabs
+
+    # 預設用電腦名稱，重跑時才認得回自己搶過的分片；同一台跑多個程序請各自指定 --node
+    node_id = node_id or socket.gethostname()
+    query_cache = load_query_cache()
+    breaker = new_breaker()
+    driver = setup_chrome_driver()
+    finished = 0
+    unsaved = 0  # 上次存快取後又查了幾筆
+    tab_handles = []  # 多分頁預查用的分頁，所有分片共用
+
+    try:
+        while True:
+            claimed_path = claim_shard(work_dir, node_id)
+            if claimed_path is None:
+                break
+
+            shard = _read_json(claimed_path)
+            name = _shard_name(os.path.basename(claimed_path))
+            journal_path = _path(work_dir, JOURNAL_DIR, f'{name}.jsonl')
+
+            done_rows = read_journal(journal_path)
+            rows = [(i, address) for i, address in shard['rows'] if i not in done_rows]
+            print(f"[INFO] {node_id} 取得 {name}：共 {len(shard['rows'])} 筆，待查 {len(rows)} 筆")
+
+            prefetched = {}
+            search_fn = make_search_fn(driver, breaker, prefetched)
+
+            def heartbeat():
+                try:
+                    os.utime(claimed_path)
+                except OSError:
+                    pass  # 已被 reclaim 放回佇列，照常寫完紀錄
+
+            def prefetch(batch):
+                # 預查期間也要更新心跳，避免查到一半被當成失聯節點收回
+                if not tab_handles:
+                    tab_handles.extend(open_tabs(driver, tab_count))
+                prefetched.update(prefetch_in_tabs(driver, batch, query_cache, tab_count, breaker, heartbeat,
+                                                   tab_handles))
+
+            with open(journal_path, 'a', encoding='utf-8') as journal:
+                if not _ends_with_newline(journal_path):
+                    journal.write('\n')  # 上次中斷留下寫一半的最後一行，換行後再接著寫
+
+                def write_row(i, full_address, simplified):
+                    nonlocal unsaved
+                    journal.write(json.dumps({'row': i, 'full_address': full_address, 'simplified': simplified},
+                                             ensure_ascii=False) + '\n')
+                    journal.flush()
+                    heartbeat()
+                    unsaved += 1
+                    if unsaved >= SAVE_EVERY:
+                        save_query_cache(query_cache)
+                        unsaved = 0
+
+                # 網站故障等待期間也更新心跳；沒查到的列不寫紀錄，重跑時會再查
+                unresolved = process_rows(rows, search_fn, query_cache, breaker, write_row,
+                                          max_outage_wait=max_outage_wait,
+                                          prefetch=prefetch if tab_count > 1 else None,
+                                          window=tab_count * PREFETCH_ROWS_PER_TAB,
+                                          on_wait=heartbeat, fail_unresolved=False)
+
+            if unresolved:
+                # 網站一直沒恢復：分片放回佇列讓之後重跑（任何節點）補查，本節點先停止
+                try:
+                    os.replace(claimed_path, _path(work_dir, QUEUE_DIR, f'{name}.json'))
+                except OSError:
+                    pass  # 已被 reclaim 放回佇列
+                print(f"[WARN] {node_id} 網站未恢復，{name} 尚有 {len(unresolved)} 筆未查，已放回佇列，請稍後重跑")
+                break
+
+            try:
+                os.replace(claimed_path, _path(work_dir, DONE_DIR, f'{name}.json'))
+            except OSError:
+                # 分片已被放回佇列：把佇列裡那份移到完成，避免重複查詢
+                queued = _path(work_dir, QUEUE_DIR, f'{name}.json')
+                if os.path.exists(queued):
+                    os.replace(queued, _path(work_dir, DONE_DIR, f'{name}.json'))
+            finished += 1
+            print(f"✅ {node_id} 完成 {name}")
+    finally:
+        save_query_cache(query_cache)
+        driver.quit()
+
+    return finished
+
+
+def merge_results(work_dir, file_path=None, jurisdiction_path='責任區.xlsx', allow_partial=False):
+    """
+    依原始列號把各分片紀錄寫回 A/C/D(/E) 欄
+    還有分片未完成時不合併（allow_partial=True 則先合併已完成的列）
+    回傳寫入的列數
+    """
+    manifest = _read_json(_path(work_dir, MANIFEST))
+    file_path = file_path or manifest['source']
+
+    unfinished = sorted(os.listdir(_path(work_dir, QUEUE_DIR)) + os.listdir(_path(work_dir, CLAIMED_DIR)))
+    unfinished = [n for n in unfinished if n.endswith('.json')]
+    if unfinished and not allow_partial:
+        print(f"[WARN] 尚有 {len(unfinished)} 個分片未完成：{'、'.join(_shard_name(n) for n in unfinished)}")
+        return 0
+
+    from openpyxl import load_workbook
+
+    from .excel import read_addresses
+
+    if addresses_digest(read_addresses(file_path)) != manifest['digest']:
+        print(f"[WARN] {file_path} 的 B欄與拆分時不同，列號可能對不上")
+
+    results = {}
+    journal_dir = _path(work_dir, JOURNAL_DIR)
+    for name in sorted(os.listdir(journal_dir)):
+        if name.endswith('.jsonl'):
+            results.update(read_journal(os.path.join(journal_dir, name)))
+
+    missing = manifest['rows'] - len(results)
+    if missing and not allow_partial:
+        print(f"[WARN] 有 {missing} 列沒有結果")
+
+    jurisdiction_index = load_jurisdiction_index(jurisdiction_path)
+
+    wb = load_workbook(file_path)
+    ws = wb.active
+    if jurisdiction_index and not ws.cell(row=1, column=5).value:
+        ws.cell(row=1, column=5, value='責任區')
+
+    for i in sorted(results):
+        full_address, simplified = results[i]
+        formatted_simplified, zone = format_row(full_address, simplified, jurisdiction_index)
+
+        # 寫入第 i+1 列（因為 Excel 有標題列）
+        ws.cell(row=i+1, column=1, value=i)  # A欄流水號
+        ws.cell(row=i+1, column=3, value=full_address)  # C欄：完整地址
+        ws.cell(row=i+1, column=4, value=formatted_simplified)  # D欄：不含鄰的地址
+        if jurisdiction_index:
+            ws.cell(row=i+1, column=5, value=zone)  # E欄：責任區
+
+    wb.save(file_path)
+    return len(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='分片批量查詢')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('split', help='拆分來源檔到共用資料夾')
+    p.add_argument('--work-dir', required=True)
+    p.add_argument('--file', default='address_data.xlsx')
+    p.add_argument('--shards', type=int, default=16)
+
+    p = sub.add_parser('work', help='在本機查詢分片直到佇列清空')
+    p.add_argument('--work-dir', required=True)
+    p.add_argument('--node', default=None, help='節點名稱，預設為電腦名稱；同一台電腦跑多個程序時各自指定')
+    p.add_argument('--tabs', type=int, default=3, help='同一個 Chrome 內的查詢分頁數')
+
+    p = sub.add_parser('reclaim', help='把沒有心跳的分片放回佇列')
+    p.add_argument('--work-dir', required=True)
+    p.add_argument('--stale', type=int, default=1800, help='超過幾秒沒有心跳視為當機')
+
+    p = sub.add_parser('merge', help='依原始列號合併結果')
+    p.add_argument('--work-dir', required=True)
+    p.add_argument('--file', default=None, help='預設為拆分時的來源檔')
+    p.add_argument('--jurisdiction', default='責任區.xlsx')
+    p.add_argument('--partial', action='store_true', help='分片未全部完成也先合併')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'split':
+        counts = split_shards(args.work_dir, args.file, args.shards)
+        print(f"✅ 已拆成 {sum(1 for c in counts if c)} 個分片，共 {sum(counts)} 筆")
+    elif args.command == 'work':
+        finished = run_worker(args.work_dir, args.node, args.tabs)
+        if any(name.endswith('.json') for name in os.listdir(_path(args.work_dir, QUEUE_DIR))):
+            print(f"[WARN] 本節點完成 {finished} 個分片，佇列仍有分片未查，請稍後重跑")
+        else:
+            print(f"✅ 佇列已清空，本節點完成 {finished} 個分片")
+    elif args.command == 'reclaim':
+        reclaimed = reclaim_stale(args.work_dir, args.stale)
+        print(f"✅ 放回 {len(reclaimed)} 個分片：{'、'.join(reclaimed)}")
+    elif args.command == 'merge':
+        written = merge_results(args.work_dir, args.file, args.jurisdiction, args.partial)
+        print(f"✅ 已合併 {written} 列")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+from .normalize import simplify_address, fullwidth_to_halfwidth, format_simplified_address, pad_text
+from .rules import remove_ling_with_condition, process_no_result_address
+
+'''
+即時查詢：逐筆輸入地址，空白結束。瀏覽器後端在 main 內才載入。
+'''
+
+# 即時查詢不套用 exception_rules.json 的保留鄰名單
+SINGLE_REQUIRE_LING = ()
+
+
+def main():
+
+    from .browser import setup_chrome_driver, search_address
+
+    print("===============今天想去哪阿?===============")
+
+    driver = setup_chrome_driver()
+    i = 0
+    while True:
+
+        address = input('給我地址：\n')    
+        i += 1
+        max_len = 55  # 用來對齊箭頭
+
+        if not address or str(address).strip() == '':
+            print(f"{i}. 空白資料，結束查詢。")
+            full_address = ""
+            simplified = ""
+            formatted_simplified = ""
+            break
+        
+        else:
+            try:
+                data_address, shorter_address, last_address = simplify_address(address)
+                result_address = search_address(driver, shorter_address)
+
+                if result_address == "找不到結果":
+                    
+                    full_address = "查無結果"
+                    
+                    simplified = process_no_result_address(data_address)
+                    formatted_simplified = format_simplified_address(simplified)
+
+                else:
+
+                    full_address = f'桃園市{result_address}{last_address}'
+                    full_address = fullwidth_to_halfwidth(full_address)
+
+                    simplified = remove_ling_with_condition(full_address, SINGLE_REQUIRE_LING)
+                    formatted_simplified = format_simplified_address(full_address)
+
+
+            except Exception as e:
+                full_address = "查詢失敗"
+                simplified = process_no_result_address(data_address)
+                formatted_simplified = format_simplified_address(simplified)
+
+        simplified = remove_ling_with_condition(full_address, SINGLE_REQUIRE_LING)
+
+        output = f"{i:03d}. {pad_text(address, max_len)}\n   → {pad_text(formatted_simplified, max_len)}\n   → {pad_text(simplified, max_len)}"
+        print(f'{output}\n')
+
+    #driver.quit()
@@ -0,0 +1,206 @@
+import time
+
+from .endpoint import query_url
+from .moi_query import ROW_XPATH
+
+'''
+單一 Chrome 多分頁併發查詢：
+在 setup_chrome_driver 建立的同一個 driver 內開 K 個分頁，輪流送出查詢，
+一個分頁等待遮罩時，其他分頁可以載入頁面或送出下一筆，
+記憶體只多幾個分頁，不必多開 Chrome。
+
+每個分頁是一個小狀態機，輪詢時只用一次 execute_script 取得狀態：
+    loading（載入查詢頁、領取下一筆）➜ querying（已送出，等遮罩出現再消失）➜ loading
+'''
+
+# 一次取回分頁狀態：頁面是否就緒、遮罩是否存在、結果表所有候選地址（第二欄）
+# 已標記為舊結果的列不算，分頁重複使用時不會把上一筆當成這一筆的結果
+_POLL_SCRIPT = '''
+var mask = !!document.querySelector('.ext-el-mask');
+var ready = !window.__tyStale && document.readyState === 'complete'
+    && !!document.getElementById('FreeText_ADDR') && !mask;
+var found = document.evaluate('%s', document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var rows = [];
+for (var i = 0; i < found.snapshotLength; i++) {
+    var tr = found.snapshotItem(i), cell = tr.cells[1];
+    if (tr.getAttribute('data-ty-stale')) { continue; }
+    if (cell && cell.textContent.trim()) { rows.push(cell.textContent.trim()); }
+}
+return {ready: ready, mask: mask, rows: rows};
+''' % ROW_XPATH
+
+# 不阻塞地切換頁面：標記舊頁，新頁載入後標記自然消失
+_NAVIGATE_SCRIPT = 'window.__tyStale = true; window.location.href = arguments[0];'
+
+# 標記舊結果後填入地址並送出（不等待結果）
+_SUBMIT_SCRIPT = '''
+var old = document.evaluate('%s', document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+for (var i = 0; i < old.snapshotLength; i++) { old.snapshotItem(i).setAttribute('data-ty-stale', '1'); }
+var box = document.getElementById('FreeText_ADDR');
+box.value = arguments[0];
+box.dispatchEvent(new Event('input', {bubbles: true}));
+box.dispatchEvent(new Event('change', {bubbles: true}));
+document.getElementById('ext-gen51').click();
+''' % ROW_XPATH
+
+
+def _navigate(driver):
+    """ 目前分頁重新載入查詢頁；分頁卡住時忽略，交給載入逾時處理 """
+    try:
+        driver.execute_script(_NAVIGATE_SCRIPT, query_url())
+    except Exception:
+        pass
+
+
+def open_tabs(driver, tab_count):
+    """
+    開啟 tab_count 個分頁（含目前分頁），每個都先載入查詢頁保持暖機
+    回傳分頁 handle 列表；整個執行期間重複使用，不必每批重開
+    """
+    handles = [driver.current_window_handle]
+    for _ in range(tab_count - 1):
+        driver.switch_to.new_window('tab')
+        handles.append(driver.current_window_handle)
+
+    for handle in handles:
+        driver.switch_to.window(handle)
+        _navigate(driver)
+    driver.switch_to.window(handles[0])
+    return handles
+
+
+def close_tabs(driver, handles):
+    """ 關閉多開的分頁，只留第一個 """
+    for handle in handles[1:]:
+        try:
+            driver.switch_to.window(handle)
+            driver.close()
+        except Exception:
+            pass
+    driver.switch_to.window(handles[0])
+
+
+def search_addresses_in_tabs(driver, queries, tab_count=3, min_interval=1.2,
+                             mask_grace=10, timeout=30, poll_interval=0.1, handles=None):
+    """
+    以多分頁輪流查詢 queries，依完成順序產生 (索引, 查詢字串, 結果, 分頁 handle, 耗時秒數)
+    - 結果為所有候選地址 list（同 search_address_candidates），查無結果為 []；
+      產生時 driver 正停在該分頁的結果頁，呼叫端可在此時讀取頁面（例如錄製）
+    - 查詢逾時或分頁出錯時，結果為 Exception 物件，交由呼叫端決定如何處理
+    - min_interval：兩次送出之間至少間隔秒數（所有分頁共用，避免查詢過快被擋）
+    - mask_grace：送出後遮罩一直沒出現，最多等幾秒就直接讀結果
+    - handles：沿用 open_tabs 開好的分頁，結束後不關閉；沒給時自行開啟並在結束時關閉。
+      無法切換的分頁（已關閉或當掉）會從 handles 移除
+    """
+    pending = list(enumerate(queries))
+    pending.reverse()  # 由尾端 pop，維持原順序送出
+
+    owns_tabs = handles is None
+    if owns_tabs:
+        handles = open_tabs(driver, min(tab_count, max(len(queries), 1)))
+    tabs = {h: {'state': 'loading', 'job': None, 'since': time.time(), 'mask_seen': False}
+            for h in handles}
+    last_submit = 0.0
+
+    def fail(handle, tab, error, now):
+        # 這筆記為失敗並重新載入分頁；回傳要產生的結果
+        i, q = tab['job']
+        elapsed = now - tab['since']
+        tab.update(job=None, state='loading', since=now)
+        _navigate(driver)
+        return i, q, error, handle, elapsed
+
+    try:
+        while pending or any(t['job'] is not None for t in tabs.values()):
+            if not tabs:
+                # 分頁全部失效：剩下的都記為失敗
+                while pending:
+                    i, q = pending.pop()
+                    yield i, q, RuntimeError(f'沒有可用的查詢分頁：{q}'), None, 0.0
+                break
+
+            progressed = False
+
+            for handle, tab in list(tabs.items()):
+                now = time.time()
+
+                try:
+                    driver.switch_to.window(handle)
+                except Exception as e:
+                    # 分頁已關閉或當掉：移出分頁池，目前這筆記為失敗
+                    del tabs[handle]
+                    handles.remove(handle)
+                    if tab['job'] is not None:
+                        i, q = tab['job']
+                        yield i, q, e, handle, now - tab['since']
+                    continue
+
+                try:
+                    status = driver.execute_script(_POLL_SCRIPT)
+                except Exception as e:
+                    # 分頁出錯：目前這筆記為失敗，重新載入分頁
+                    if tab['job'] is not None:
+                        yield fail(handle, tab, e, now)
+                    else:
+                        tab.update(state='loading', since=now)
+                        _navigate(driver)
+                    continue
+
+                if tab['state'] == 'loading':
+                    if tab['job'] is None and pending:
+                        tab['job'] = pending.pop()
+
+                    if not status['ready']:
+                        if now - tab['since'] > timeout:
+                            # 查詢頁載入逾時：這筆記為失敗，重新載入
+                            if tab['job'] is not None:
+                                yield fail(handle, tab, TimeoutError(f'查詢頁載入逾時：{tab["job"][1]}'), now)
+                            else:
+                                tab.update(since=now)
+                                _navigate(driver)
+                        continue
+
+                    if tab['job'] is None or now - last_submit < min_interval:
+                        continue
+                    try:
+                        driver.execute_script(_SUBMIT_SCRIPT, tab['job'][1])
+                    except Exception as e:
+                        yield fail(handle, tab, e, now)
+                        continue
+                    last_submit = now
+                    tab.update(state='querying', since=now, mask_seen=False)
+                    progressed = True
+
+                elif tab['state'] == 'querying':
+                    if status['mask']:
+                        tab['mask_seen'] = True
+                        if now - tab['since'] > timeout:
+                            yield fail(handle, tab, TimeoutError(f'查詢遮罩未消失：{tab["job"][1]}'), now)
+                        continue
+                    # 遮罩已消失；若從沒看到遮罩，先等一段寬限時間（可能還沒出現）
+                    if not tab['mask_seen'] and not status['rows'] and now - tab['since'] < mask_grace:
+                        continue
+
+                    i, q = tab['job']
+                    yield i, q, status['rows'], handle, now - tab['since']
+                    tab['job'] = None
+                    progressed = True
+
+                    # 重新載入查詢頁，讓下一筆在乾淨的頁面上查詢
+                    tab.update(state='loading', since=time.time())
+                    try:
+                        driver.switch_to.window(handle)  # 呼叫端可能切換過分頁
+                    except Exception:
+                        continue
+                    _navigate(driver)
+
+            if not progressed:
+                time.sleep(poll_interval)
+    finally:
+        if owns_tabs:
+            close_tabs(driver, handles)
+        elif handles:
+            try:
+                driver.switch_to.window(handles[0])  # 逐筆查詢固定用第一個分頁
+            except Exception:
+                pass